@@ -0,0 +1,360 @@
+# Autor: Oscar Díaz
+
+"""
+Offline, deterministic benchmark suite for the four scripts of the project.
+
+Covers:
+    - generation.main at several scales (560 rows → 560k rows).
+    - every rule of validation.RULES (pandas), PY_RULES (pure Python) and COL_RULES (mmap'd binary columns)
+      over the dataset generated at each scale, the sampled mode (sampling.run_sampled) and conformance.py.
+    - generate_modify.generate_rows for varying --n.
+    - boulanger_scrapping.product_jsonld + extract_fields over the saved pages in benchmarks/fixtures/boulanger.
+    - dedup.dedup_rows over synthetic listings with colour variants.
+    - simulation.write_dataset (all price models) at several scales.
+    - cold start of cli.py (fresh interpreter per run) for --help and small jobs.
+
+Records wall time, rows/s and peak memory (tracemalloc) and compares them with a JSON baseline.
+
+Run commands:
+    - python benchmark.py                        → compare with benchmarks/baseline.json
+    - python benchmark.py --update-baseline      → overwrite the baseline with this run
+    - python benchmark.py --max-rows 560000      → include the largest scale
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "task1-Modification"))
+
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baseline.json")
+FIXTURES_DIR = os.path.join(ROOT, "benchmarks", "fixtures", "boulanger")
+
+BENCH_SEED = 42
+BENCH_ANCHOR_DAY = datetime(2025, 10, 3, tzinfo=timezone.utc)
+
+# generation.main builds every record as a dict: 560k rows already take ~1.3 GB RSS, so 10M rows
+# (~20+ GB) are out of reach of a normal machine and are not part of the suite.
+GENERATION_ROWS = [560, 5_600, 56_000, 560_000]
+SYNTH_N = [100, 1_000, 10_000, 100_000, 1_000_000]
+SCRAPE_PAGES = [6, 60, 600]
+DEDUP_LISTINGS = [1_000, 10_000, 100_000]
+DEDUP_VARIANT_SHARE = 0.2
+SAMPLE_RATE = 0.05
+SIMULATION_ROWS = [7_280, 36_400, 728_000, 7_280_000]
+SIMULATION_WEEKS = 52
+DEFAULT_MAX_ROWS = 56_000
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.20
+# From this scale a benchmark runs once, under tracemalloc, instead of best-of-N plus a traced run.
+SINGLE_PASS_ROWS = 500_000
+
+# Rows per generated week: 2 retailers × 7 brands × 10 models. Scales are reached through NUM_WEEKS.
+ROWS_PER_WEEK = 7 * 10 * 2
+# Timings below this are dominated by noise and are not flagged.
+MIN_WALL_S = 0.005
+
+CLI_PATH = os.path.join(ROOT, "cli.py")
+STARTUP_REPEAT = 5
+# Absolute cold-start targets (seconds), checked on every run in addition to the baseline.
+STARTUP_TARGETS = {
+    "startup.cli_help": 0.1,
+    "startup.validate_help": 0.1,
+    "startup.validate[560]": 0.1,
+}
+
+def measure(fn: Callable[[], Any], rows: int, repeat: int) -> Dict[str, float]:
+    best = float("inf")
+    if rows < SINGLE_PASS_ROWS:
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - t0)
+
+    tracemalloc.start()
+    try:
+        t0 = time.perf_counter()
+        fn()
+        traced_wall = time.perf_counter() - t0
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    if rows >= SINGLE_PASS_ROWS:
+        # The wall time includes tracemalloc's overhead; it is compared only with runs measured the same way.
+        best = traced_wall
+
+    return {
+        "rows": rows,
+        "wall_s": round(best, 6),
+        "rows_per_s": round(rows / best, 1) if best > 0 else 0.0,
+        "peak_mb": round(peak / (1024 * 1024), 3),
+    }
+
+def repeat_for(rows: int, repeat: int) -> int:
+    return repeat if rows < SINGLE_PASS_ROWS else 1
+
+@contextlib.contextmanager
+def generation_settings() -> Iterator[None]:
+    """Restores the generation.py module settings the benchmarks override."""
+    import generation
+
+    saved = (generation.ANCHOR_DAY, generation.NUM_WEEKS)
+    try:
+        generation.ANCHOR_DAY = BENCH_ANCHOR_DAY
+        yield
+    finally:
+        generation.ANCHOR_DAY, generation.NUM_WEEKS = saved
+
+def bench_generation_and_validation(max_rows: int, repeat: int, results: Dict[str, Dict[str, float]]) -> None:
+    import columnar
+    import conformance
+    import generation
+    import sampling
+    import validation
+
+    with generation_settings():
+        cwd = os.getcwd()
+        for rows in [r for r in GENERATION_ROWS if r <= max_rows]:
+            weeks = max(1, round(rows / ROWS_PER_WEEK))
+            generation.NUM_WEEKS = weeks
+            actual_rows = ROWS_PER_WEEK * weeks
+
+            with tempfile.TemporaryDirectory() as tmp:
+                os.chdir(tmp)
+                try:
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        results[f"generation.main[{rows}]"] = measure(lambda: generation.main([]), actual_rows, repeat_for(rows, repeat))
+                    df = validation.load_dataset(validation.CSV_PATH)
+                    results[f"validation.load_dataset[{rows}]"] = measure(
+                        lambda: validation.load_dataset(validation.CSV_PATH), len(df), repeat_for(rows, repeat)
+                    )
+                    for name, rule in validation.RULES:
+                        results[f"validation.{name}[{rows}]"] = measure(lambda: rule(df), len(df), repeat_for(rows, repeat))
+
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        results[f"sampling.run_sampled[{SAMPLE_RATE}][{rows}]"] = measure(
+                            lambda: sampling.run_sampled(df, SAMPLE_RATE), len(df), repeat_for(rows, repeat)
+                        )
+
+                    table = validation.load_table(validation.CSV_PATH)
+                    results[f"validation.load_table[{rows}]"] = measure(
+                        lambda: validation.load_table(validation.CSV_PATH), len(table.rows), repeat_for(rows, repeat)
+                    )
+                    for name, rule in validation.PY_RULES:
+                        results[f"validation.py_{name}[{rows}]"] = measure(lambda: rule(table), len(table.rows), repeat_for(rows, repeat))
+
+                    columnar.convert_csv(validation.CSV_PATH, "dataset.cols")
+                    ds = columnar.open_columnar("dataset.cols")
+                    results[f"columnar.open[{rows}]"] = measure(lambda: columnar.open_columnar("dataset.cols"), len(ds), repeat_for(rows, repeat))
+                    for name, rule in validation.COL_RULES:
+                        results[f"validation.col_{name}[{rows}]"] = measure(lambda: rule(ds), len(ds), repeat_for(rows, repeat))
+
+                    results[f"conformance.sketch_csv[{rows}]"] = measure(
+                        lambda: conformance.sketch_csv(validation.CSV_PATH), len(df), repeat_for(rows, repeat)
+                    )
+                    results[f"conformance.sketch_columnar[{rows}]"] = measure(
+                        lambda: conformance.sketch_columnar("dataset.cols"), len(ds), repeat_for(rows, repeat)
+                    )
+                finally:
+                    os.chdir(cwd)
+
+def bench_generate_modify(max_rows: int, repeat: int, results: Dict[str, Dict[str, float]]) -> None:
+    import numpy as np
+    import generate_modify
+
+    for n in [n for n in SYNTH_N if n <= max_rows]:
+        def run() -> None:
+            random.seed(BENCH_SEED)
+            np.random.seed(BENCH_SEED)
+            generate_modify.generate_rows(n, "Boulanger")
+        results[f"generate_modify.generate_rows[{n}]"] = measure(run, n, repeat_for(n, repeat))
+
+def load_fixture_pages() -> List[str]:
+    pages = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.html"))):
+        with open(path, encoding="utf-8") as f:
+            pages.append(f.read())
+    if not pages:
+        raise SystemExit(f"No fixture pages found in {FIXTURES_DIR}")
+    return pages
+
+def bench_scraper(max_rows: int, repeat: int, results: Dict[str, Dict[str, float]]) -> None:
+    from bs4 import BeautifulSoup
+    import boulanger_scrapping
+
+    corpus = load_fixture_pages()
+    for n in [n for n in SCRAPE_PAGES if n <= max_rows]:
+        pages = [corpus[i % len(corpus)] for i in range(n)]
+        soups = [BeautifulSoup(html, "html.parser") for html in pages]
+        products = [boulanger_scrapping.product_jsonld(s)[0] for s in soups]
+
+        results[f"scraper.parse_html[{n}]"] = measure(
+            lambda: [BeautifulSoup(html, "html.parser") for html in pages], n, repeat
+        )
+        results[f"scraper.product_jsonld[{n}]"] = measure(
+            lambda: [boulanger_scrapping.product_jsonld(s) for s in soups], n, repeat
+        )
+        results[f"scraper.extract_fields[{n}]"] = measure(
+            lambda: [boulanger_scrapping.extract_fields(p) for p in products], n, repeat
+        )
+
+    import dedup
+    import generate_modify
+
+    random.seed(BENCH_SEED)
+    for n in [n for n in DEDUP_LISTINGS if n <= max_rows]:
+        # Listings followed by colour variants of a share of them, as repeated /ref/ pages would be.
+        n_variants = int(n * DEDUP_VARIANT_SHARE)
+        listings = generate_modify.generate_rows(n - n_variants, "boulanger", beta=random.betavariate)
+        listings += [dict(r, **{"Product Name": f"{r['Product Name']} Noir"}) for r in listings[:n_variants]]
+        urls = [f"/ref/{i}" for i in range(n)]
+        results[f"scraper.dedup[{n}]"] = measure(lambda: dedup.dedup_rows(listings, urls), n, repeat)
+
+def bench_simulation(max_rows: int, repeat: int, results: Dict[str, Dict[str, float]]) -> None:
+    import generation
+    import simulation
+
+    # SIMULATION_ROWS are whole retailers: multiples of 70 series × 52 weeks.
+    for rows in [r for r in SIMULATION_ROWS if r <= max_rows]:
+        retailers = rows // (len(generation.BRANDS) * simulation.MODELS_PER_BRAND * SIMULATION_WEEKS)
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, "simulation.cols")
+            results[f"simulation.write_dataset[{rows}]"] = measure(
+                lambda: simulation.write_dataset(out, retailers, SIMULATION_WEEKS, seed=BENCH_SEED), rows, repeat_for(rows, repeat)
+            )
+
+def time_command(args: List[str], cwd: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, CLI_PATH] + args, cwd=cwd, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def bench_startup(results: Dict[str, Dict[str, float]]) -> None:
+    commands = {
+        "startup.cli_help": ["--help"],
+        "startup.generate_help": ["generate", "--help"],
+        "startup.validate_help": ["validate", "--help"],
+        "startup.synth_segment_help": ["synth-segment", "--help"],
+        "startup.scrape_help": ["scrape", "--help"],
+        "startup.generate[560]": ["generate"],
+        "startup.validate[560]": ["validate"],
+        "startup.synth_segment[100]": ["synth-segment", "--retailer", "Fnac", "--n", "100", "--out", "segment.csv"],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for key, args in commands.items():
+            wall = time_command(args, tmp, STARTUP_REPEAT)
+            # Peak memory of a child process is not measured here.
+            results[key] = {"rows": 1, "wall_s": round(wall, 6), "rows_per_s": round(1 / wall, 1), "peak_mb": 0.0}
+
+def over_target(current: Dict[str, Dict[str, float]]) -> List[str]:
+    return [
+        f"{key}: wall {current[key]['wall_s']:.4f}s over target {target:.3f}s"
+        for key, target in STARTUP_TARGETS.items()
+        if key in current and current[key]["wall_s"] > target
+    ]
+
+def compare(current: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    regressions = []
+    for key, cur in current.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        if base["wall_s"] >= MIN_WALL_S and cur["wall_s"] > base["wall_s"] * (1 + threshold):
+            regressions.append(f"{key}: wall {base['wall_s']:.4f}s → {cur['wall_s']:.4f}s")
+        if base["peak_mb"] > 0 and cur["peak_mb"] > base["peak_mb"] * (1 + threshold):
+            regressions.append(f"{key}: peak {base['peak_mb']:.2f}MB → {cur['peak_mb']:.2f}MB")
+    return regressions
+
+def print_results(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]]) -> None:
+    print(f"{'benchmark':<48} {'wall_s':>10} {'rows/s':>14} {'peak_mb':>10} {'vs base':>9}")
+    for key, r in results.items():
+        base = baseline.get(key)
+        delta = f"{100 * (r['wall_s'] / base['wall_s'] - 1):+.1f}%" if base and base["wall_s"] > 0 else "-"
+        print(f"{key:<48} {r['wall_s']:>10.4f} {r['rows_per_s']:>14.1f} {r['peak_mb']:>10.2f} {delta:>9}")
+
+def load_baseline(path: str) -> Dict[str, Dict[str, float]]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get("results", {})
+
+def save_results(path: str, results: Dict[str, Dict[str, float]], args: argparse.Namespace) -> None:
+    payload = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "max_rows": args.max_rows,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+        f.write("\n")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmark suite with regression thresholds.")
+    parser.add_argument("--max-rows", type=int, default=DEFAULT_MAX_ROWS, help=f"Largest scale to run (default {DEFAULT_MAX_ROWS}).")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help=f"Timed repetitions, best is kept (default {DEFAULT_REPEAT}).")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed relative regression (default 0.20 = 20%%).")
+    parser.add_argument("--baseline", type=str, default=BASELINE_PATH, help="Baseline JSON file.")
+    parser.add_argument("--update-baseline", action="store_true", help="Write this run as the new baseline.")
+    parser.add_argument("--out", type=str, default=None, help="Also write this run's results to a JSON file.")
+    parser.add_argument("--only", choices=["generation", "simulation", "synth", "scraper", "startup"], default=None, help="Run a single group.")
+    args = parser.parse_args(argv)
+
+    random.seed(BENCH_SEED)
+    results: Dict[str, Dict[str, float]] = {}
+    if args.only in (None, "generation"):
+        bench_generation_and_validation(args.max_rows, args.repeat, results)
+    if args.only in (None, "simulation"):
+        bench_simulation(args.max_rows, args.repeat, results)
+    if args.only in (None, "synth"):
+        bench_generate_modify(args.max_rows, args.repeat, results)
+    if args.only in (None, "scraper"):
+        bench_scraper(args.max_rows, args.repeat, results)
+    if args.only in (None, "startup"):
+        bench_startup(results)
+
+    baseline = load_baseline(args.baseline)
+    print_results(results, baseline)
+
+    if args.out:
+        save_results(args.out, results, args)
+    if args.update_baseline:
+        save_results(args.baseline, results, args)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    regressions = over_target(results)
+    if not baseline:
+        print("No baseline found; run with --update-baseline to record one.")
+    else:
+        regressions += compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"REGRESSIONS (threshold {args.threshold:.0%}):")
+        for line in regressions:
+            print(f"- {line}")
+        return 1
+    print(f"No regressions beyond {args.threshold:.0%}.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
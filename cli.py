@@ -0,0 +1,104 @@
+# Autor: Oscar Díaz
+
+"""
+Single entry point for the project scripts.
+
+Run commands:
+    - python cli.py generate [--engine auto|python|pandas]
+    - python cli.py validate [--csv dataset.csv] [--engine auto|python|pandas] [--binary dataset.cols]
+    - python cli.py convert [dataset.csv] [dataset.cols]
+    - python cli.py conformance [--csv dataset.csv | --binary dataset.cols]
+    - python cli.py simulate [--weeks 52] [--retailers 2] [--models random_walk,seasonal]
+    - python cli.py synth-segment --retailer Fnac --n 100
+    - python cli.py scrape [--pipeline async]
+
+Only argparse is imported here; each command imports its script when it runs, and the
+scripts import pandas/numpy/requests/bs4 only on the code paths that need them.
+"""
+
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+TASK1_DIR = os.path.join(ROOT, "task1-Modification")
+
+COMMANDS = {
+    "generate": "Generate dataset.csv / dataset.json (generation.py).",
+    "validate": "Validate a dataset against the business rules (validation.py).",
+    "convert": "Convert a dataset CSV into the mmap-able binary column layout (columnar.py).",
+    "conformance": "Check the dataset's distributions against the generator's configuration (conformance.py).",
+    "simulate": "Simulate (series x weeks) price paths into the binary column layout (simulation.py).",
+    "synth-segment": "Generate a synthetic Traditional_Segment CSV (task1-Modification/generate_modify.py).",
+    "scrape": "Scrape Boulanger laptops (task1-Modification/boulanger_scrapping.py).",
+}
+
+def run_generate(rest: List[str]) -> int:
+    import generation
+    generation.main(rest)
+    return 0
+
+def run_validate(rest: List[str]) -> int:
+    import validation
+    try:
+        validation.main(rest)
+    except AssertionError as e:
+        print(f"VALIDATION FAILED: {e}")
+        return 1
+    return 0
+
+def run_convert(rest: List[str]) -> int:
+    import columnar
+    return columnar.main(rest)
+
+def run_conformance(rest: List[str]) -> int:
+    import conformance
+    return conformance.main(rest)
+
+def run_simulate(rest: List[str]) -> int:
+    import simulation
+    return simulation.main(rest)
+
+def run_synth_segment(rest: List[str]) -> int:
+    sys.path.insert(0, TASK1_DIR)
+    import generate_modify
+    generate_modify.main(rest)
+    return 0
+
+def run_scrape(rest: List[str]) -> int:
+    sys.path.insert(0, TASK1_DIR)
+    import boulanger_scrapping
+    boulanger_scrapping.main(rest)
+    return 0
+
+HANDLERS = {
+    "generate": run_generate,
+    "validate": run_validate,
+    "convert": run_convert,
+    "conformance": run_conformance,
+    "simulate": run_simulate,
+    "synth-segment": run_synth_segment,
+    "scrape": run_scrape,
+}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="cli.py",
+        description="Laptop price dataset tools. Use 'python cli.py <command> --help' for the options of each command.",
+    )
+    sub = parser.add_subparsers(dest="command", metavar="command")
+    for name, help_text in COMMANDS.items():
+        # The command's own parser handles its options (including -h).
+        sub.add_parser(name, help=help_text, add_help=False)
+    args, rest = parser.parse_known_args(argv)
+
+    if not args.command:
+        parser.print_help()
+        return 2
+
+    sys.argv[0] = f"cli.py {args.command}"
+    return HANDLERS[args.command](rest)
+
+if __name__ == "__main__":
+    sys.exit(main())
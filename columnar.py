@@ -0,0 +1,221 @@
+# Autor: Oscar Díaz
+
+"""
+Binary column layout for the generated dataset, read through mmap.
+
+A dataset directory (e.g. dataset.cols/) holds:
+    - meta.json      → row count, column order, kind of each column, categories and sort order.
+    - <column>.npy   → one NumPy array per column (np.save format).
+
+Column kinds:
+    - category  → int16 codes into the sorted "categories" list of meta.json (-1 = null);
+                  int32 when a column has more than 32767 distinct values.
+    - float     → float64 (NaN = null).
+    - int       → int16 (values outside its range are rejected).
+    - bool      → bool.
+    - date      → datetime64[D] (NaT = null).
+    - datetime  → datetime64[s], UTC (NaT = null).
+Each column entry of meta.json records the dtype of its .npy file.
+
+Rows are stored sorted by (retailer, brand, model_id, week_start). open_columnar() maps every
+file with np.load(mmap_mode="r"): opening costs the page-in time, not a CSV parse, the arrays
+are read-only zero-copy views, and several processes reading the same files share the pages.
+
+Run command:
+    - python columnar.py dataset.csv dataset.cols
+"""
+
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+FORMAT = "columnar-v1"
+META_FILE = "meta.json"
+SORT_KEY = ["retailer", "brand", "model_id", "week_start"]
+
+COLUMN_KINDS = {
+    "retailer": "category",
+    "brand": "category",
+    "model_id": "category",
+    "model_name": "category",
+    "condition": "category",
+    "week_start": "date",
+    "price": "float",
+    "promo_price": "float",
+    "installment_price": "float",
+    "promo_start": "datetime",
+    "promo_end": "datetime",
+    "promo_type": "category",
+    "promo_active": "bool",
+    "prev_week_price": "float",
+    "price_change_abs": "float",
+    "price_change_pct": "float",
+    "rank_within_brand": "int",
+    "availability_status": "category",
+    "currency": "category",
+    "scraped_at": "datetime",
+}
+
+def code_dtype(n_categories: int) -> np.dtype:
+    """Smallest signed integer dtype for category codes 0..n-1 plus the -1 null code."""
+    return np.dtype(np.int16) if n_categories <= np.iinfo(np.int16).max else np.dtype(np.int32)
+
+def _encode(series: "pd.Series", kind: str) -> Dict[str, Any]:
+    import pandas as pd
+
+    name = series.name
+    if kind == "category":
+        codes, uniques = pd.factorize(series, sort=True, use_na_sentinel=True)
+        return {"array": codes.astype(code_dtype(len(uniques))), "categories": [str(u) for u in uniques]}
+    if kind == "float":
+        return {"array": pd.to_numeric(series, errors="raise").to_numpy(dtype=np.float64, na_value=np.nan)}
+    if kind == "int":
+        values = pd.to_numeric(series, errors="raise")
+        if values.isna().any():
+            raise ValueError(f"{name}: null values cannot be stored as int")
+        limits = np.iinfo(np.int16)
+        if len(values) and (values.min() < limits.min or values.max() > limits.max):
+            raise ValueError(f"{name}: values outside the int16 range [{limits.min}, {limits.max}]")
+        return {"array": values.to_numpy(dtype=np.int16)}
+    if kind == "bool":
+        return {"array": series.astype(str).isin(["True", "true", "TRUE"]).to_numpy()}
+    if kind == "date":
+        try:
+            parsed = pd.to_datetime(series, format="%Y-%m-%d", errors="raise")
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"{name}: not an ISO date ({e})") from None
+        return {"array": parsed.to_numpy(dtype="datetime64[D]")}
+    if kind == "datetime":
+        try:
+            parsed = pd.to_datetime(series, format="ISO8601", utc=True, errors="raise")
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"{name}: not an ISO datetime ({e})") from None
+        return {"array": parsed.dt.tz_localize(None).to_numpy(dtype="datetime64[s]")}
+    raise ValueError(f"{name}: unknown column kind {kind}")
+
+def write_columnar(df: "pd.DataFrame", out_dir: str) -> Dict[str, Any]:
+    os.makedirs(out_dir, exist_ok=True)
+    columns = [c for c in df.columns if c in COLUMN_KINDS]
+
+    encoded = {c: _encode(df[c], COLUMN_KINDS[c]) for c in columns}
+    sorted_by: List[str] = []
+    order: Optional[np.ndarray] = None
+    if all(c in encoded for c in SORT_KEY):
+        # Categories are sorted, so ordering by codes is the same as ordering by the strings.
+        order = np.lexsort([encoded[c]["array"] for c in reversed(SORT_KEY)])
+        sorted_by = SORT_KEY
+
+    meta: Dict[str, Any] = {"format": FORMAT, "rows": len(df), "sorted_by": sorted_by, "columns": []}
+    for c in columns:
+        arr = encoded[c]["array"]
+        if order is not None:
+            arr = arr[order]
+        np.save(os.path.join(out_dir, f"{c}.npy"), np.ascontiguousarray(arr))
+        entry: Dict[str, Any] = {"name": c, "kind": COLUMN_KINDS[c], "dtype": arr.dtype.str}
+        if "categories" in encoded[c]:
+            entry["categories"] = encoded[c]["categories"]
+        meta["columns"].append(entry)
+
+    # meta.json is written last: a directory without it is an incomplete dataset.
+    with open(os.path.join(out_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return meta
+
+def convert_csv(csv_path: str, out_dir: str) -> Dict[str, Any]:
+    import pandas as pd
+
+    df = pd.read_csv(csv_path, dtype={"retailer": str, "brand": str, "model_id": str})
+    return write_columnar(df, out_dir)
+
+class ColumnarDataset:
+    def __init__(self, path: str, meta: Dict[str, Any], arrays: Dict[str, np.ndarray]):
+        self.path = path
+        self.meta = meta
+        self.arrays = arrays
+        self.kinds = {c["name"]: c["kind"] for c in meta["columns"]}
+        self.category_lists = {c["name"]: c["categories"] for c in meta["columns"] if "categories" in c}
+
+    @property
+    def columns(self) -> List[str]:
+        return [c["name"] for c in self.meta["columns"]]
+
+    @property
+    def n_rows(self) -> int:
+        return self.meta["rows"]
+
+    @property
+    def sorted_by(self) -> List[str]:
+        return self.meta.get("sorted_by", [])
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.arrays[name]
+
+    def categories(self, name: str) -> List[str]:
+        return self.category_lists[name]
+
+    def used_categories(self, name: str) -> List[Optional[str]]:
+        """Distinct values present in a category column (None for nulls), without decoding it."""
+        counts = np.bincount(self.arrays[name].astype(np.intp) + 1, minlength=len(self.category_lists[name]) + 1)
+        cats: List[Optional[str]] = [None] + list(self.category_lists[name])
+        return [cats[i] for i in np.flatnonzero(counts)]
+
+    def decode(self, name: str) -> np.ndarray:
+        """Category column as an object array of strings (None for nulls). Allocates."""
+        lookup = np.array(list(self.category_lists[name]) + [None], dtype=object)
+        return lookup[self.arrays[name]]
+
+    def to_frame(self, columns: Optional[List[str]] = None) -> "pd.DataFrame":
+        """DataFrame over the mapped arrays; category columns become pd.Categorical (codes are not decoded)."""
+        import pandas as pd
+
+        data = {}
+        for name in columns or self.columns:
+            arr = self.arrays[name]
+            if self.kinds[name] == "category":
+                data[name] = pd.Categorical.from_codes(arr, categories=self.category_lists[name])
+            else:
+                data[name] = arr
+        return pd.DataFrame(data, copy=False)
+
+def is_columnar(path: str) -> bool:
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, META_FILE))
+
+def open_columnar(path: str) -> ColumnarDataset:
+    with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("format") != FORMAT:
+        raise ValueError(f"{path}: unsupported format {meta.get('format')!r}")
+
+    arrays = {}
+    for c in meta["columns"]:
+        arr = np.load(os.path.join(path, f"{c['name']}.npy"), mmap_mode="r")
+        if len(arr) != meta["rows"]:
+            raise ValueError(f"{path}: column {c['name']} has {len(arr)} rows, expected {meta['rows']}")
+        if "dtype" in c and arr.dtype != np.dtype(c["dtype"]):
+            raise ValueError(f"{path}: column {c['name']} is {arr.dtype}, meta.json says {c['dtype']}")
+        arrays[c["name"]] = arr
+    return ColumnarDataset(path, meta, arrays)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Converts dataset.csv into the mmap-able binary column layout.")
+    parser.add_argument("csv", nargs="?", default="dataset.csv", help="Input CSV (default dataset.csv).")
+    parser.add_argument("out", nargs="?", default="dataset.cols", help="Output directory (default dataset.cols).")
+    args = parser.parse_args(argv)
+
+    meta = convert_csv(args.csv, args.out)
+    print(f"Binary dataset written to {args.out}: {meta['rows']} rows, {len(meta['columns'])} columns.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,326 @@
+# Autor: Oscar Díaz
+
+"""
+Distribution conformance of a generated dataset against the generator's configuration.
+
+Checks the simulation rules of the README against the constants of generation.py:
+    - availability_status ~ AVAIL_WEIGHTS (70/20/10)         → chi-square goodness of fit
+    - condition ~ COND_WEIGHTS (90/5/5)                      → chi-square goodness of fit
+    - promo window in PROMO_PROBABILITY (~30%) of rows       → chi-square (binomial)
+    - promo_price in PROMO_PRICE_PROBABILITY of the windows  → chi-square (binomial)
+    - installment_price in INSTALLMENT_PROBABILITY of rows   → chi-square (binomial)
+    - discount 1 - promo_price/price ~ U(DISCOUNT_RANGE)     → range + chi-square on a histogram
+    - week-over-week change within ±WEEKLY_DRIFT of the base → range of price_change_pct
+
+Every statistic comes from one vectorized pass that fills a Sketch: counts, a fixed-bin
+histogram and moments. Sketches from different chunks or worker processes combine with
+Sketch.merge(), so a CSV is streamed in chunks and a binary dataset (columnar.py) is split
+by row ranges across processes that share the mapped pages.
+
+Run commands:
+    - python conformance.py [--csv dataset.csv] [--chunksize 1000000] [--alpha 0.001]
+    - python conformance.py --binary dataset.cols [--workers 4]
+"""
+
+import argparse
+import math
+import sys
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple, TYPE_CHECKING
+
+import generation
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from columnar import ColumnarDataset
+
+CSV_PATH = "dataset.csv"
+DEFAULT_CHUNKSIZE = 1_000_000
+DEFAULT_ALPHA = 0.001
+
+DISCOUNT_BINS = 15
+# promo_price is rounded to cents, so the observed discount can leave the range by a hair.
+DISCOUNT_TOLERANCE = 0.001
+PCT_TOLERANCE = 0.02
+
+USECOLS = ["availability_status", "condition", "price", "promo_price", "installment_price", "promo_start", "price_change_pct"]
+
+def pct_bounds() -> Tuple[float, float]:
+    # Two independent drifts around the same base: (1 ± d) / (1 ∓ d) - 1.
+    d = generation.WEEKLY_DRIFT
+    return 100 * ((1 - d) / (1 + d) - 1), 100 * ((1 + d) / (1 - d) - 1)
+
+class Sketch:
+    """Mergeable summary of the distributional statistics of a dataset."""
+
+    def __init__(self) -> None:
+        self.rows = 0
+        self.avail: Dict[str, int] = {}
+        self.condition: Dict[str, int] = {}
+        self.promo_windows = 0
+        self.promo_prices = 0
+        self.installments = 0
+        # [below range] + DISCOUNT_BINS bins + [above range]
+        self.discount_hist = [0] * (DISCOUNT_BINS + 2)
+        self.pct_n = 0
+        self.pct_sum = 0.0
+        self.pct_sumsq = 0.0
+        self.pct_min = math.inf
+        self.pct_max = -math.inf
+        self.pct_out_of_range = 0
+
+    def merge(self, other: "Sketch") -> "Sketch":
+        self.rows += other.rows
+        for mine, theirs in ((self.avail, other.avail), (self.condition, other.condition)):
+            for k, v in theirs.items():
+                mine[k] = mine.get(k, 0) + v
+        self.promo_windows += other.promo_windows
+        self.promo_prices += other.promo_prices
+        self.installments += other.installments
+        self.discount_hist = [a + b for a, b in zip(self.discount_hist, other.discount_hist)]
+        self.pct_n += other.pct_n
+        self.pct_sum += other.pct_sum
+        self.pct_sumsq += other.pct_sumsq
+        self.pct_min = min(self.pct_min, other.pct_min)
+        self.pct_max = max(self.pct_max, other.pct_max)
+        self.pct_out_of_range += other.pct_out_of_range
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "Sketch":
+        s = cls()
+        s.__dict__.update(d)
+        return s
+
+    def _update_arrays(self, price: Any, promo_price: Any, has_window: Any, has_installment: Any, pct: Any) -> None:
+        import numpy as np
+
+        self.rows += len(price)
+        self.promo_windows += int(np.count_nonzero(has_window))
+        self.installments += int(np.count_nonzero(has_installment))
+
+        has_pp = ~np.isnan(promo_price)
+        self.promo_prices += int(np.count_nonzero(has_pp))
+        lo, hi = generation.DISCOUNT_RANGE
+        discount = 1 - promo_price[has_pp] / price[has_pp]
+        edges = np.linspace(lo, hi, DISCOUNT_BINS + 1)
+        inside = np.clip(discount, lo, np.nextafter(hi, lo))
+        self.discount_hist[0] += int(np.count_nonzero(discount < lo - DISCOUNT_TOLERANCE))
+        self.discount_hist[-1] += int(np.count_nonzero(discount > hi + DISCOUNT_TOLERANCE))
+        in_tol = (discount >= lo - DISCOUNT_TOLERANCE) & (discount <= hi + DISCOUNT_TOLERANCE)
+        hist = np.bincount((np.searchsorted(edges, inside, side="right") - 1)[in_tol], minlength=DISCOUNT_BINS)
+        for i, v in enumerate(hist[:DISCOUNT_BINS]):
+            self.discount_hist[i + 1] += int(v)
+
+        pct = pct[~np.isnan(pct)]
+        if len(pct):
+            lo_pct, hi_pct = pct_bounds()
+            self.pct_n += len(pct)
+            self.pct_sum += float(pct.sum())
+            self.pct_sumsq += float(np.square(pct).sum())
+            self.pct_min = min(self.pct_min, float(pct.min()))
+            self.pct_max = max(self.pct_max, float(pct.max()))
+            self.pct_out_of_range += int(np.count_nonzero((pct < lo_pct - PCT_TOLERANCE) | (pct > hi_pct + PCT_TOLERANCE)))
+
+    def update_frame(self, df: "pd.DataFrame") -> "Sketch":
+        for col, counts in (("availability_status", self.avail), ("condition", self.condition)):
+            for k, v in df[col].value_counts(dropna=False).items():
+                key = "null" if k != k or k is None else str(k)
+                counts[key] = counts.get(key, 0) + int(v)
+        self._update_arrays(
+            df["price"].to_numpy(dtype=float),
+            df["promo_price"].to_numpy(dtype=float, na_value=float("nan")),
+            df["promo_start"].notna().to_numpy(),
+            df["installment_price"].notna().to_numpy(),
+            df["price_change_pct"].to_numpy(dtype=float, na_value=float("nan")),
+        )
+        return self
+
+    def update_columnar(self, ds: "ColumnarDataset", start: int = 0, stop: Optional[int] = None) -> "Sketch":
+        import numpy as np
+
+        stop = len(ds) if stop is None else stop
+        for col, counts in (("availability_status", self.avail), ("condition", self.condition)):
+            cats = ["null"] + ds.categories(col)
+            bins = np.bincount(ds[col][start:stop].astype(np.intp) + 1, minlength=len(cats))
+            for i in np.flatnonzero(bins):
+                counts[cats[i]] = counts.get(cats[i], 0) + int(bins[i])
+        self._update_arrays(
+            ds["price"][start:stop],
+            ds["promo_price"][start:stop],
+            ~np.isnat(ds["promo_start"][start:stop]),
+            ~np.isnan(ds["installment_price"][start:stop]),
+            ds["price_change_pct"][start:stop],
+        )
+        return self
+
+def chi2_sf(x: float, df: int) -> float:
+    """Survival function of the chi-square distribution: regularized upper incomplete gamma Q(df/2, x/2)."""
+    if x <= 0:
+        return 1.0
+    a, x = df / 2.0, x / 2.0
+    gln = math.lgamma(a)
+    if x < a + 1:
+        term = total = 1.0 / a
+        ap = a
+        for _ in range(10_000):
+            ap += 1
+            term *= x / ap
+            total += term
+            if abs(term) < abs(total) * 1e-15:
+                break
+        return max(0.0, 1.0 - total * math.exp(-x + a * math.log(x) - gln))
+    # Continued fraction (modified Lentz).
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 10_000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return min(1.0, math.exp(-x + a * math.log(x) - gln) * h)
+
+def chi2_gof(observed: Sequence[int], probabilities: Sequence[float]) -> Tuple[float, int, float]:
+    n = sum(observed)
+    df = len(observed) - 1
+    if n == 0:
+        return 0.0, df, 1.0
+    stat = sum((o - n * p) ** 2 / (n * p) for o, p in zip(observed, probabilities) if p > 0)
+    return stat, df, chi2_sf(stat, df)
+
+class Check(NamedTuple):
+    name: str
+    expected: str
+    observed: str
+    p_value: Optional[float]
+    passed: bool
+
+def _share(counts: Dict[str, int], total: int) -> str:
+    return ", ".join(f"{k} {100 * v / total:.1f}%" for k, v in counts.items()) if total else "-"
+
+def _p_value(observed: Sequence[int], probabilities: Sequence[float]) -> Optional[float]:
+    # Without observations there is nothing to test: the check fails with no p-value.
+    return chi2_gof(observed, probabilities)[2] if sum(observed) else None
+
+def evaluate(s: Sketch, alpha: float = DEFAULT_ALPHA) -> List[Check]:
+    checks = []
+
+    for name, col_counts, choices, weights in (
+        ("availability_status", s.avail, generation.AVAIL_CHOICES, generation.AVAIL_WEIGHTS),
+        ("condition", s.condition, generation.COND_CHOICES, generation.COND_WEIGHTS),
+    ):
+        unexpected = sum(v for k, v in col_counts.items() if k not in choices)
+        observed = [col_counts.get(c, 0) for c in choices]
+        p = _p_value(observed, weights)
+        checks.append(Check(
+            name,
+            ", ".join(f"{c} {100 * w:.0f}%" for c, w in zip(choices, weights)),
+            _share(col_counts, s.rows),
+            p,
+            p is not None and p >= alpha and unexpected == 0,
+        ))
+
+    for name, hits, n, prob in (
+        ("promo window", s.promo_windows, s.rows, generation.PROMO_PROBABILITY),
+        ("promo_price | window", s.promo_prices, s.promo_windows, generation.PROMO_PRICE_PROBABILITY),
+        ("installment_price", s.installments, s.rows, generation.INSTALLMENT_PROBABILITY),
+    ):
+        p = _p_value([hits, n - hits], [prob, 1 - prob])
+        checks.append(Check(name, f"{100 * prob:.0f}%", f"{100 * hits / n:.2f}% of {n}" if n else "-", p, p is not None and p >= alpha))
+
+    lo, hi = generation.DISCOUNT_RANGE
+    below, bins, above = s.discount_hist[0], s.discount_hist[1:-1], s.discount_hist[-1]
+    p = _p_value(bins, [1 / DISCOUNT_BINS] * DISCOUNT_BINS)
+    checks.append(Check(
+        "discount",
+        f"uniform {100 * lo:.0f}–{100 * hi:.0f}%",
+        f"{sum(bins)} in range, {below + above} outside" if sum(bins) + below + above else "-",
+        p,
+        p is not None and p >= alpha and below + above == 0,
+    ))
+
+    lo_pct, hi_pct = pct_bounds()
+    if s.pct_n:
+        mean = s.pct_sum / s.pct_n
+        std = math.sqrt(max(0.0, s.pct_sumsq / s.pct_n - mean * mean))
+        observed = f"min {s.pct_min:.2f}%, max {s.pct_max:.2f}%, mean {mean:.2f}%, std {std:.2f}%"
+    else:
+        observed = "-"
+    checks.append(Check(
+        "price_change_pct",
+        f"within [{lo_pct:.2f}%, {hi_pct:.2f}%] (±{100 * generation.WEEKLY_DRIFT:.0f}% drift)",
+        observed,
+        None,
+        s.pct_out_of_range == 0,
+    ))
+    return checks
+
+def sketch_csv(path: str, chunksize: int = DEFAULT_CHUNKSIZE) -> Sketch:
+    import pandas as pd
+
+    sketch = Sketch()
+    for chunk in pd.read_csv(path, usecols=USECOLS, chunksize=chunksize):
+        sketch.update_frame(chunk)
+    return sketch
+
+def _sketch_range(args: Tuple[str, int, int]) -> Dict[str, Any]:
+    from columnar import open_columnar
+
+    path, start, stop = args
+    return Sketch().update_columnar(open_columnar(path), start, stop).to_dict()
+
+def sketch_columnar(path: str, workers: int = 1) -> Sketch:
+    from columnar import open_columnar
+
+    ds = open_columnar(path)
+    if workers <= 1:
+        return Sketch().update_columnar(ds)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    step = math.ceil(len(ds) / workers)
+    ranges = [(path, i, min(i + step, len(ds))) for i in range(0, len(ds), step)]
+    sketch = Sketch()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(_sketch_range, ranges):
+            sketch.merge(Sketch.from_dict(part))
+    return sketch
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Checks the dataset's distributions against the generator's configuration.")
+    parser.add_argument("--csv", type=str, default=CSV_PATH, help=f"Dataset CSV (default {CSV_PATH}).")
+    parser.add_argument("--binary", type=str, default=None, help="Binary column directory (see columnar.py) instead of a CSV.")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="CSV rows per chunk.")
+    parser.add_argument("--workers", type=int, default=1, help="Processes for --binary input (default 1).")
+    parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA, help=f"Significance level (default {DEFAULT_ALPHA}).")
+    args = parser.parse_args(argv)
+
+    sketch = sketch_columnar(args.binary, args.workers) if args.binary else sketch_csv(args.csv, args.chunksize)
+    checks = evaluate(sketch, args.alpha)
+
+    print(f"Conformance ({sketch.rows} rows, alpha {args.alpha}):")
+    for c in checks:
+        p = f"p={c.p_value:.4g}" if c.p_value is not None else ("range" if c.name == "price_change_pct" else "no data")
+        print(f"- [{'OK' if c.passed else 'FAIL'}] {c.name}: expected {c.expected}; observed {c.observed} ({p})")
+
+    failed = [c.name for c in checks if not c.passed]
+    if failed:
+        print(f"CONFORMANCE FAILED: {failed}")
+        return 1
+    print("Conformance completed.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,16 @@
 # Autor: Oscar Díaz
 
+import argparse
+import csv
+import json
+import math
 import random
 import string
 from datetime import datetime, timedelta, timezone
-from dateutil.relativedelta import relativedelta
-import numpy as np
-import pandas as pd
-from typing import Optional, Tuple, List, Dict, Any
+from typing import Optional, Tuple, List, Dict, Any, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 RANDOM_SEED = 42
 NUM_WEEKS = 4
@@ -32,6 +36,23 @@ COND_WEIGHTS = [0.90, 0.05, 0.05]
 
 CURRENCY = "EUR"
 
+PROMO_PROBABILITY = 0.30        # share of rows with a promo window
+PROMO_PRICE_PROBABILITY = 0.80  # share of promo windows with a promo_price
+DISCOUNT_RANGE = (0.05, 0.20)
+INSTALLMENT_PROBABILITY = 0.60
+WEEKLY_DRIFT = 0.10             # price = base price × (1 ± drift)
+PROMO_TYPES = ["flash_sale", "clearance", "back_to_school", "weekend_deal"]
+
+COLUMNS = [
+    "retailer","brand","model_id","model_name","condition","week_start","price","promo_price",
+    "installment_price","promo_start","promo_end","promo_type","promo_active","prev_week_price",
+    "price_change_abs","price_change_pct","rank_within_brand","availability_status","currency","scraped_at"
+]
+
+# Up to this many rows the pure-Python path is used: it avoids importing pandas/numpy,
+# which costs more than the whole job at this size.
+SMALL_JOB_ROWS = 50_000
+
 MODEL_CATALOG = {
     "HP": [
         "Envy 13", "Pavilion 14", "Spectre x360", "Omen 16", "Victus 15",
@@ -87,27 +108,31 @@ def normalize_model_id(brand: str, model_name: str) -> str:
     return tokens
 
 def sample_installment(price: float) -> Optional[float]:
-    if random.random() < 0.60:
+    if random.random() < INSTALLMENT_PROBABILITY:
         return round(price / 4.0, 2)
     return None
 
 def promo_window_for_week(week_start_dt: datetime) -> Tuple[Optional[datetime], Optional[datetime], Optional[str]]:
-    if random.random() >= 0.30:
+    if random.random() >= PROMO_PROBABILITY:
         return None, None, None
     start_offset_days = random.randint(-3, 3)
     promo_start = week_start_dt + timedelta(days=start_offset_days, hours=random.randint(0, 20))
     duration_days = random.randint(2, 10)
     promo_end = promo_start + timedelta(days=duration_days, hours=random.randint(0, 20))
-    promo_type = random.choice(["flash_sale", "clearance", "back_to_school", "weekend_deal"])
+    promo_type = random.choice(PROMO_TYPES)
     return promo_start, promo_end, promo_type
 
 def promo_price_from(price: float) -> Optional[float]:
-    if random.random() < 0.80:
-        disc = random.uniform(0.05, 0.20)
+    if random.random() < PROMO_PRICE_PROBABILITY:
+        disc = random.uniform(*DISCOUNT_RANGE)
         return round(price * (1 - disc), 2)
     return None
 
-def compute_rank_within_brand(df: pd.DataFrame) -> pd.DataFrame:
+def round2(x: float) -> float:
+    # Same as pandas/numpy .round(2): rint(x * 100) / 100, keeping the sign of -0.0.
+    return math.copysign(round(x * 100) / 100, x)
+
+def compute_rank_within_brand(df: "pd.DataFrame") -> "pd.DataFrame":
     df["rank_within_brand"] = (
         df.groupby(["retailer", "brand", "week_start"])["price"]
           .rank(method="first", ascending=True)
@@ -115,9 +140,8 @@ def compute_rank_within_brand(df: pd.DataFrame) -> pd.DataFrame:
     )
     return df
 
-def main() -> None:
+def build_records() -> List[Dict[str, Any]]:
     random.seed(RANDOM_SEED)
-    np.random.seed(RANDOM_SEED)
 
     records: List[Dict[str, Any]] = []
     week_starts = week_starts_list(ANCHOR_DAY, NUM_WEEKS)
@@ -136,7 +160,7 @@ def main() -> None:
                     if key not in base_prices:
                         base_prices[key] = round(random.uniform(price_min, price_max), 2)
 
-                    drift = random.uniform(-0.10, 0.10)
+                    drift = random.uniform(-WEEKLY_DRIFT, WEEKLY_DRIFT)
                     price = max(0.0, round(base_prices[key] * (1 + drift), 2))
 
                     installment_price = sample_installment(price)
@@ -174,10 +198,16 @@ def main() -> None:
                         "rank_within_brand": None,
                         "availability_status": random.choices(AVAIL_CHOICES, weights=AVAIL_WEIGHTS, k=1)[0],
                         "currency": CURRENCY,
-                        "scraped_at": iso_dt(week_dt + relativedelta(hours=random.randint(7, 18)))
+                        "scraped_at": iso_dt(week_dt + timedelta(hours=random.randint(7, 18)))
                     }
                     records.append(record)
 
+    return records
+
+def finalize_pandas(records: List[Dict[str, Any]]) -> List[str]:
+    import numpy as np
+    import pandas as pd
+
     df = pd.DataFrame(records)
 
     df["week_start_dt"] = pd.to_datetime(df["week_start"], format="%Y-%m-%d", utc=True)
@@ -197,25 +227,76 @@ def main() -> None:
 
     df = compute_rank_within_brand(df)
 
-    columns = [
-        "retailer","brand","model_id","model_name","condition","week_start","price","promo_price",
-        "installment_price","promo_start","promo_end","promo_type","promo_active","prev_week_price",
-        "price_change_abs","price_change_pct","rank_within_brand","availability_status","currency","scraped_at"
-    ]
-    df = df[columns]
+    df = df[COLUMNS]
 
     df.to_csv("dataset.csv", index=False)
     df.to_json("dataset.json", orient="records", force_ascii=False, indent=2)
+    return df["week_start"].tolist()
+
+def finalize_python(records: List[Dict[str, Any]]) -> List[str]:
+    # Pure-Python equivalent of finalize_pandas; writes byte-identical files.
+    rows = sorted(records, key=lambda r: (r["retailer"], r["brand"], r["model_id"], r["week_start"]))
+
+    prev_key, prev_price = None, None
+    for r in rows:
+        key = (r["retailer"], r["brand"], r["model_id"])
+        prev = round2(prev_price) if key == prev_key and prev_price is not None else None
+        r["prev_week_price"] = prev
+        r["price_change_abs"] = round2(r["price"] - prev) if prev is not None else None
+        r["price_change_pct"] = round2(100 * r["price_change_abs"] / prev) if prev else None
+        prev_key, prev_price = key, r["price"]
+
+    groups: Dict[Tuple[str, str, str], List[int]] = {}
+    for i, r in enumerate(rows):
+        groups.setdefault((r["retailer"], r["brand"], r["week_start"]), []).append(i)
+    for idxs in groups.values():
+        for rank, i in enumerate(sorted(idxs, key=lambda i: (rows[i]["price"], i)), start=1):
+            rows[i]["rank_within_brand"] = rank
+
+    with open("dataset.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(COLUMNS)
+        for r in rows:
+            writer.writerow(["" if r[c] is None else r[c] for c in COLUMNS])
+    with open("dataset.json", "w", encoding="utf-8") as f:
+        # pandas' JSON writer prints -0.0 as 0.0 (its CSV writer keeps the sign).
+        records_out = [{c: (r[c] + 0.0 if isinstance(r[c], float) else r[c]) for c in COLUMNS} for r in rows]
+        json.dump(records_out, f, ensure_ascii=False, indent=2, separators=(",", ":"))
+    return [r["week_start"] for r in rows]
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generates the synthetic dataset (dataset.csv / dataset.json).")
+    parser.add_argument("--engine", choices=["auto", "python", "pandas"], default="auto",
+                        help=f"auto: pure Python up to {SMALL_JOB_ROWS} rows, pandas above (default auto).")
+    parser.add_argument("--binary", nargs="?", const="dataset.cols", default=None, metavar="DIR",
+                        help="Also write the mmap-able binary column layout (default dir dataset.cols).")
+    args = parser.parse_args(argv)
 
     rows_expected = len(BRANDS) * 10 * len(RETAILERS) * NUM_WEEKS
+    engine = args.engine
+    if engine == "auto":
+        engine = "python" if rows_expected <= SMALL_JOB_ROWS else "pandas"
+
+    records = build_records()
+    if engine == "python":
+        week_start = finalize_python(records)
+    else:
+        week_start = finalize_pandas(records)
+
+    if args.binary:
+        from columnar import convert_csv
+        convert_csv("dataset.csv", args.binary)
+
     print("Generation Summary:")
     print(f"   Brands: {len(BRANDS)} → {BRANDS}")
     print(f"   Retailers: {RETAILERS}")
-    print(f"   Weeks: {NUM_WEEKS} (from {df['week_start'].min()} to {df['week_start'].max()})")
-    print(f"   Rows generated: {len(df)} (expected: {rows_expected})")
+    print(f"   Weeks: {NUM_WEEKS} (from {min(week_start)} to {max(week_start)})")
+    print(f"   Rows generated: {len(week_start)} (expected: {rows_expected})")
     print("   Files:")
     print("   - dataset.csv")
     print("   - dataset.json")
+    if args.binary:
+        print(f"   - {args.binary}/ (binary columns)")
 
 if __name__ == "__main__":
     main()
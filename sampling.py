@@ -0,0 +1,153 @@
+# Autor: Oscar Díaz
+
+"""
+Tiered (sampled) validation for very large datasets.
+
+    - Cheap rules (columns, enums, currency, negative values, rank range and duplicates, row count)
+      run on every row. Rank duplicates are between different series of the same
+      (retailer, brand, week), which a sample of whole series cannot observe; they are checked
+      with a single vectorized duplicated() instead of validation.py's per-group apply.
+    - Expensive rules (ISO parsing, promo windows, the groupby recompute of prev_week_price)
+      run on a stratified random sample: within each (retailer, brand) a fraction
+      --sample-rate of the model series is drawn, with all of its weeks, so the weekly
+      recompute is exact for every sampled series.
+    - For each expensive rule the report gives the violations found in the sample and a
+      Wilson score interval for the share of series with at least one violation. Series are
+      the sampling unit (a cluster sample) and one bad price breaks several rows of its series,
+      so the interval is computed over series, not rows, and extrapolated to the dataset's series.
+    - Only if the sample flags a problem do the expensive rules run on the whole dataset,
+      which raises the usual assertion.
+
+Run command:
+    - python validation.py --engine pandas --sample-rate 0.05 [--confidence 0.95] [--seed 42]
+"""
+
+import math
+from statistics import NormalDist
+from typing import Callable, Dict, List, NamedTuple, Tuple, TYPE_CHECKING
+
+import validation
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_SEED = 42
+
+SERIES_KEY = ["retailer", "brand", "model_id"]
+STRATUM_KEY = ["retailer", "brand"]
+
+CHEAP_RULES = ["required_columns", "enums", "non_negative", "rank_within_brand", "min_rows"]
+EXPENSIVE_RULES = ["iso_dates", "promo_active", "weekly_changes"]
+
+RANK_KEY = ["retailer", "brand", "week_start", "rank_within_brand"]
+
+class RuleEstimate(NamedTuple):
+    rule: str
+    sampled_series: int
+    bad_series: int
+    violations: int   # rows
+    rate: float       # share of sampled series with at least one violation
+    low: float
+    high: float
+
+def wilson_interval(k: int, n: int, confidence: float = DEFAULT_CONFIDENCE) -> Tuple[float, float]:
+    if n == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = k / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+def stratified_sample(df: "pd.DataFrame", rate: float, seed: int = DEFAULT_SEED) -> "pd.DataFrame":
+    import numpy as np
+
+    series = df[SERIES_KEY].drop_duplicates()
+    rng = np.random.default_rng(seed)
+    # One random key per series; the lowest ceil(rate * n) per stratum are kept (at least one).
+    series = series.assign(_u=rng.random(len(series)))
+    series["_pos"] = series.groupby(STRATUM_KEY, dropna=False)["_u"].rank(method="first")
+    series["_n"] = series.groupby(STRATUM_KEY, dropna=False)["_u"].transform("size")
+    keep = series[series["_pos"] <= np.ceil(rate * series["_n"])][SERIES_KEY]
+    return df.merge(keep, on=SERIES_KEY, how="inner")
+
+def check_rank_within_brand(df: "pd.DataFrame") -> None:
+    rank = df["rank_within_brand"]
+    out_of_range = int(((rank < 1) | (rank > 10)).sum())
+    assert out_of_range == 0, f"rank_within_brand out of 1..10 in {out_of_range} rows"
+
+    dups = int(df.duplicated(subset=RANK_KEY).sum())
+    assert dups == 0, f"rank_within_brand duplicated within some (retailer,brand,week_start): {dups} duplicates"
+
+# Cheap-tier replacements for rules of validation.RULES whose full-engine version is slow.
+CHEAP_CHECKS: Dict[str, Callable[["pd.DataFrame"], None]] = {
+    "rank_within_brand": check_rank_within_brand,
+}
+
+def iso_dates_mask(df: "pd.DataFrame") -> "pd.Series":
+    bad = ~df["week_start"].astype(str).apply(validation.is_iso_date)
+    for col in ["promo_start","promo_end","scraped_at"]:
+        bad |= df[col].notna() & ~df[col].astype(str).apply(validation.is_iso_datetime_z)
+    return bad
+
+def promo_active_mask(df: "pd.DataFrame") -> "pd.Series":
+    import pandas as pd
+
+    active = df["promo_active"] == True
+    ps = pd.to_datetime(df["promo_start"].where(active), utc=True, errors="coerce")
+    pe = pd.to_datetime(df["promo_end"].where(active), utc=True, errors="coerce")
+    ws = pd.to_datetime(df["week_start"].where(active), format="%Y-%m-%d", utc=True, errors="coerce")
+    return active & (df["promo_price"].isna() | ps.isna() | pe.isna() | (ws < ps) | (ws > pe))
+
+def weekly_changes_mask(df: "pd.DataFrame") -> "pd.Series":
+    import numpy as np
+
+    df_sorted = df.sort_values(by=["retailer","brand","model_id","week_start"])
+    recomputed_prev = df_sorted.groupby(SERIES_KEY)["price"].shift(1)
+    dif_abs = (df_sorted["price"] - recomputed_prev).round(2)
+    dif_pct = (100 * dif_abs / recomputed_prev).round(2)
+    prev = df_sorted["prev_week_price"]
+
+    bad = ~np.isclose(prev.fillna(-999999), recomputed_prev.fillna(-999999))
+    bad |= prev.notna().to_numpy() & ~np.isclose(df_sorted["price_change_abs"], dif_abs)
+    bad |= (prev.notna() & (prev != 0)).to_numpy() & ~np.isclose(df_sorted["price_change_pct"], dif_pct)
+    return df_sorted.assign(_bad=bad)["_bad"].reindex(df.index)
+
+VIOLATION_MASKS: Dict[str, Callable[["pd.DataFrame"], "pd.Series"]] = {
+    "iso_dates": iso_dates_mask,
+    "promo_active": promo_active_mask,
+    "weekly_changes": weekly_changes_mask,
+}
+
+def estimate(sample: "pd.DataFrame", confidence: float = DEFAULT_CONFIDENCE) -> List[RuleEstimate]:
+    estimates = []
+    for name in EXPENSIVE_RULES:
+        bad = VIOLATION_MASKS[name](sample)
+        per_series = bad.groupby([sample[c] for c in SERIES_KEY], dropna=False).any()
+        k, n = int(per_series.sum()), len(per_series)
+        low, high = wilson_interval(k, n, confidence)
+        estimates.append(RuleEstimate(name, n, k, int(bad.sum()), k / n if n else 0.0, low, high))
+    return estimates
+
+def run_sampled(df: "pd.DataFrame", rate: float, confidence: float = DEFAULT_CONFIDENCE, seed: int = DEFAULT_SEED) -> List[RuleEstimate]:
+    rules = {**dict(validation.RULES), **CHEAP_CHECKS}
+    for name in CHEAP_RULES:
+        rules[name](df)
+
+    sample = stratified_sample(df, rate, seed)
+    estimates = estimate(sample, confidence)
+
+    n_series = len(df[SERIES_KEY].drop_duplicates())
+    print(f"Sampled validation: {len(sample)} of {len(df)} rows (rate {rate:g}, seed {seed}, confidence {confidence:.0%})")
+    for e in estimates:
+        print(f"- {e.rule}: {e.violations} violating rows in {e.bad_series}/{e.sampled_series} series; "
+              f"series rate {e.rate:.4%} [{e.low:.4%}, {e.high:.4%}] → up to ~{math.ceil(e.high * n_series)} of {n_series} series")
+
+    flagged = [e.rule for e in estimates if e.violations]
+    if flagged:
+        print(f"Sample flagged {flagged}; running the exhaustive pass.")
+        for name in EXPENSIVE_RULES:
+            rules[name](df)
+    return estimates
@@ -0,0 +1,377 @@
+# Autor: Oscar Díaz
+
+"""
+Vectorized price simulation: every (retailer, brand, model) series evolves at once as a
+(series × weeks) matrix in NumPy, instead of generation.py's independent weekly drift.
+
+log(price) = log(base price of the model) + the sum of the enabled models (MODELS):
+    - random_walk     → cumulative N(0, RW_SIGMA) weekly moves.
+    - mean_reversion  → AR(1) deviation (MR_PHI, MR_SIGMA) that pulls back towards the base price.
+    - seasonal        → Black Friday week (and half the depth the week after) and back-to-school
+                        (15 Aug – 14 Sep) discounts, with a per-series depth.
+    - retailer        → a common move per retailer and week, correlated across retailers
+                        (RETAILER_CORRELATION) through a shared market factor.
+    - launch_decay    → from each model's launch week the price decays towards 1 - depth,
+                        with time constant LAUNCH_TAU_WEEKS.
+A model is a function (block, rng) → (series, weeks) array of log-price components; adding
+an entry to MODELS makes it available to --models.
+
+Promo windows, promo prices, installments, condition, availability and scraped_at are drawn
+as whole-matrix events with the probabilities of generation.py.
+
+Series are processed in blocks of whole retailers (about BLOCK_CELLS cells each) and written straight into the
+binary column layout of columnar.py (rows sorted by retailer, brand, model_id, week_start),
+so memory stays bounded for millions of series. Every block, model and event kind draws from
+its own stream default_rng([seed, stream, block]): the output depends only on the seed, the
+shape, the models and the last week (--end-week, a fixed date by default rather than today,
+since the seasonal shocks follow the calendar), and enabling a model does not change the draws
+of the others.
+
+Run commands:
+    - python simulation.py [--weeks 52] [--retailers 2] [--models random_walk,seasonal] [--seed 42] [--end-week 2025-10-03] [--out simulation.cols]
+    - python validation.py --binary simulation.cols
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+import generation
+from columnar import COLUMN_KINDS, FORMAT, META_FILE, SORT_KEY, code_dtype
+
+DEFAULT_WEEKS = 52
+# week_start of the last simulated week.
+DEFAULT_END_WEEK = "2025-10-03"
+DEFAULT_OUT = "simulation.cols"
+MODELS_PER_BRAND = 10
+# Target (series × weeks) cells per block: whole retailers are grouped up to this size.
+# Part of how the random streams are laid out, so changing it changes the output.
+BLOCK_CELLS = 1_000_000
+
+RW_SIGMA = 0.01
+MR_PHI = 0.8
+MR_SIGMA = 0.03
+BLACK_FRIDAY_DEPTH = (0.08, 0.20)
+BACK_TO_SCHOOL_DEPTH = (0.03, 0.10)
+RETAILER_SIGMA = 0.01
+RETAILER_CORRELATION = 0.6
+LAUNCH_DEPTH = (0.15, 0.35)
+LAUNCH_TAU_WEEKS = 26.0
+LAUNCH_LOOKBACK_WEEKS = 104
+
+DAY = 86_400
+HOUR = 3_600
+
+STREAM_BASE, STREAM_MARKET, STREAM_PROMO, STREAM_ATTRS = 0, 1, 2, 3
+MODEL_STREAM_OFFSET = 10
+
+# Category lists of the binary layout are sorted; weights follow the sorted order.
+COND_SORTED = sorted(generation.COND_CHOICES)
+COND_P = [generation.COND_WEIGHTS[generation.COND_CHOICES.index(c)] for c in COND_SORTED]
+AVAIL_SORTED = sorted(generation.AVAIL_CHOICES)
+AVAIL_P = [generation.AVAIL_WEIGHTS[generation.AVAIL_CHOICES.index(c)] for c in AVAIL_SORTED]
+PROMO_TYPES_SORTED = sorted(generation.PROMO_TYPES)
+MODEL_IDS_SORTED = sorted({generation.normalize_model_id(b, m) for b in generation.BRANDS for m in generation.MODEL_CATALOG[b][:MODELS_PER_BRAND]})
+MODEL_NAMES_SORTED = sorted({m for b in generation.BRANDS for m in generation.MODEL_CATALOG[b][:MODELS_PER_BRAND]})
+MODEL_ID_CODE = {m: i for i, m in enumerate(MODEL_IDS_SORTED)}
+MODEL_NAME_CODE = {m: i for i, m in enumerate(MODEL_NAMES_SORTED)}
+
+class Grid(NamedTuple):
+    retailers: List[str]         # sorted
+    brands: List[str]            # sorted
+    model_ids: List[List[str]]   # per brand, sorted
+    model_names: List[List[str]]
+    week_starts: np.ndarray      # datetime64[D]
+
+    @property
+    def n_series(self) -> int:
+        return len(self.retailers) * len(self.brands) * MODELS_PER_BRAND
+
+    @property
+    def n_weeks(self) -> int:
+        return len(self.week_starts)
+
+class Block(NamedTuple):
+    grid: Grid
+    index: int
+    retailer: np.ndarray   # global retailer index of each series
+    brand: np.ndarray
+    model: np.ndarray      # model index within the brand
+    market: np.ndarray     # shared market shocks, (weeks,)
+
+    @property
+    def n(self) -> int:
+        return len(self.retailer)
+
+def retailer_names(n: int) -> List[str]:
+    names = list(generation.RETAILERS[:n])
+    names += [f"Retailer-{i:05d}" for i in range(len(names) + 1, n + 1)]
+    return names
+
+def make_grid(n_retailers: int, n_weeks: int, end_week: str = DEFAULT_END_WEEK) -> Grid:
+    brands = sorted(generation.BRANDS)
+    model_ids, model_names = [], []
+    for brand in brands:
+        pairs = sorted((generation.normalize_model_id(brand, m), m) for m in generation.MODEL_CATALOG[brand][:MODELS_PER_BRAND])
+        model_ids.append([p[0] for p in pairs])
+        model_names.append([p[1] for p in pairs])
+    last = np.datetime64(end_week, "D")
+    week_starts = last - 7 * np.arange(n_weeks - 1, -1, -1)
+    return Grid(sorted(retailer_names(n_retailers)), brands, model_ids, model_names, week_starts)
+
+def stream(seed: int, kind: int, block: int = 0) -> np.random.Generator:
+    return np.random.default_rng([seed, kind, block])
+
+def random_walk(block: Block, rng: np.random.Generator) -> np.ndarray:
+    return np.cumsum(rng.normal(0.0, RW_SIGMA, (block.n, block.grid.n_weeks)), axis=1)
+
+def mean_reversion(block: Block, rng: np.random.Generator) -> np.ndarray:
+    eps = rng.normal(0.0, MR_SIGMA, (block.n, block.grid.n_weeks))
+    # First week drawn from the stationary distribution of the AR(1).
+    eps[:, 0] /= np.sqrt(1 - MR_PHI ** 2)
+    for t in range(1, eps.shape[1]):
+        eps[:, t] += MR_PHI * eps[:, t - 1]
+    return eps
+
+def season_profiles(week_starts: np.ndarray) -> np.ndarray:
+    """(2, weeks): Black Friday profile (1 that week, 0.5 the week after) and back-to-school indicator."""
+    years = week_starts.astype("datetime64[Y]")
+    november = (years.astype("datetime64[M]") + 10).astype("datetime64[D]")
+    # Black Friday: the day after the fourth Thursday of November.
+    black_friday = np.busday_offset(november, 3, roll="forward", weekmask="Thu") + 1
+    offset = (black_friday - week_starts).astype(np.int64)
+    bf = np.where((offset >= 0) & (offset < 7), 1.0, np.where((offset >= -7) & (offset < 0), 0.5, 0.0))
+
+    august_1 = (years.astype("datetime64[M]") + 7).astype("datetime64[D]")
+    day = (week_starts - august_1).astype(np.int64)
+    bts = ((day >= 14) & (day <= 44)).astype(np.float64)
+    return np.stack([bf, bts])
+
+def seasonal(block: Block, rng: np.random.Generator) -> np.ndarray:
+    bf, bts = season_profiles(block.grid.week_starts)
+    depth_bf = rng.uniform(*BLACK_FRIDAY_DEPTH, block.n)
+    depth_bts = rng.uniform(*BACK_TO_SCHOOL_DEPTH, block.n)
+    return np.log1p(-np.multiply.outer(depth_bf, bf)) + np.log1p(-np.multiply.outer(depth_bts, bts))
+
+def correlated_retailer(block: Block, rng: np.random.Generator) -> np.ndarray:
+    first = int(block.retailer[0])
+    own = rng.normal(0.0, 1.0, (int(block.retailer[-1]) - first + 1, block.grid.n_weeks))
+    shocks = np.sqrt(RETAILER_CORRELATION) * block.market + np.sqrt(1 - RETAILER_CORRELATION) * own
+    moves = RETAILER_SIGMA * np.cumsum(shocks, axis=1)
+    return moves[block.retailer - first]
+
+def launch_decay(block: Block, rng: np.random.Generator) -> np.ndarray:
+    launch = rng.integers(-LAUNCH_LOOKBACK_WEEKS, block.grid.n_weeks, block.n)
+    depth = rng.uniform(*LAUNCH_DEPTH, block.n)
+    age = np.clip(np.arange(block.grid.n_weeks) - launch[:, None], 0, None)
+    return np.log1p(-depth[:, None] * -np.expm1(-age / LAUNCH_TAU_WEEKS))
+
+MODELS: Dict[str, Callable[[Block, np.random.Generator], np.ndarray]] = {
+    "random_walk": random_walk,
+    "mean_reversion": mean_reversion,
+    "seasonal": seasonal,
+    "retailer": correlated_retailer,
+    "launch_decay": launch_decay,
+}
+
+def market_shocks(seed: int, n_weeks: int) -> np.ndarray:
+    return stream(seed, STREAM_MARKET).normal(0.0, 1.0, n_weeks)
+
+def base_prices(grid: Grid, seed: int) -> np.ndarray:
+    """(brands, models): one base price per model, shared by every retailer."""
+    rng = stream(seed, STREAM_BASE)
+    lo = np.array([generation.PRICE_RANGES[b][0] for b in grid.brands], dtype=np.float64)
+    hi = np.array([generation.PRICE_RANGES[b][1] for b in grid.brands], dtype=np.float64)
+    return np.round(rng.uniform(lo[:, None], hi[:, None], (len(grid.brands), MODELS_PER_BRAND)), 2)
+
+def block_retailers(grid: Grid) -> int:
+    return max(1, BLOCK_CELLS // (len(grid.brands) * MODELS_PER_BRAND * grid.n_weeks))
+
+def make_block(grid: Grid, index: int, market: np.ndarray) -> Block:
+    r0 = index * block_retailers(grid)
+    r1 = min(len(grid.retailers), r0 + block_retailers(grid))
+    per_retailer = len(grid.brands) * MODELS_PER_BRAND
+    return Block(
+        grid,
+        index,
+        np.repeat(np.arange(r0, r1), per_retailer),
+        np.tile(np.repeat(np.arange(len(grid.brands)), MODELS_PER_BRAND), r1 - r0),
+        np.tile(np.arange(MODELS_PER_BRAND), (r1 - r0) * len(grid.brands)),
+        market,
+    )
+
+def n_blocks(grid: Grid) -> int:
+    return -(-len(grid.retailers) // block_retailers(grid))
+
+def block_prices(block: Block, base: np.ndarray, models: Sequence[str], seed: int) -> np.ndarray:
+    names = list(MODELS)
+    log_price = np.zeros((block.n, block.grid.n_weeks))
+    for name in models:
+        log_price += MODELS[name](block, stream(seed, MODEL_STREAM_OFFSET + names.index(name), block.index))
+    return np.round(base[block.brand, block.model][:, None] * np.exp(log_price), 2)
+
+def simulate_prices(n_retailers: int, n_weeks: int, models: Sequence[str] = tuple(MODELS), seed: int = generation.RANDOM_SEED,
+                    end_week: str = DEFAULT_END_WEEK) -> np.ndarray:
+    """(series × weeks) price matrix, series ordered by (retailer, brand, model_id). Allocates all of it."""
+    grid = make_grid(n_retailers, n_weeks, end_week)
+    base = base_prices(grid, seed)
+    market = market_shocks(seed, n_weeks)
+    return np.concatenate([block_prices(make_block(grid, i, market), base, models, seed) for i in range(n_blocks(grid))])
+
+def block_columns(block: Block, price: np.ndarray, seed: int) -> Dict[str, np.ndarray]:
+    shape = price.shape
+    ws = block.grid.week_starts.astype("datetime64[s]").astype(np.int64)
+
+    rng = stream(seed, STREAM_PROMO, block.index)
+    window = rng.random(shape) < generation.PROMO_PROBABILITY
+    start = ws + rng.integers(-3, 4, shape) * DAY + rng.integers(0, 21, shape) * HOUR
+    end = start + rng.integers(2, 11, shape) * DAY + rng.integers(0, 21, shape) * HOUR
+    promo_type = rng.integers(0, len(PROMO_TYPES_SORTED), shape).astype(np.int16)
+    priced = window & (rng.random(shape) < generation.PROMO_PRICE_PROBABILITY)
+    discount = rng.uniform(*generation.DISCOUNT_RANGE, shape)
+    promo_price = np.where(priced, np.round(price * (1 - discount), 2), np.nan)
+    active = priced & (start <= ws) & (ws <= end)
+
+    rng = stream(seed, STREAM_ATTRS, block.index)
+    installment = np.where(rng.random(shape) < generation.INSTALLMENT_PROBABILITY, np.round(price / 4.0, 2), np.nan)
+    condition = rng.choice(len(COND_SORTED), size=shape, p=COND_P).astype(np.int16)
+    availability = rng.choice(len(AVAIL_SORTED), size=shape, p=AVAIL_P).astype(np.int16)
+    scraped_at = ws + rng.integers(7, 19, shape) * HOUR
+
+    prev = np.full(shape, np.nan)
+    prev[:, 1:] = price[:, :-1]
+    change_abs = np.round(price - prev, 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change_pct = np.where(prev != 0, np.round(100 * change_abs / prev, 2), np.nan)
+
+    # Rank by price within (retailer, brand, week); ties keep model_id order, like rank(method="first").
+    grouped = price.reshape(-1, MODELS_PER_BRAND, shape[1])
+    order = np.argsort(grouped, axis=1, kind="stable")
+    rank = np.empty(grouped.shape, dtype=np.int16)
+    np.put_along_axis(rank, order, np.arange(1, MODELS_PER_BRAND + 1, dtype=np.int16)[None, :, None], axis=1)
+
+    def per_series(codes: np.ndarray, dtype: np.dtype = np.dtype(np.int16)) -> np.ndarray:
+        return np.repeat(codes.astype(dtype), shape[1])
+
+    model_code = np.array([[MODEL_ID_CODE[m] for m in ids] for ids in block.grid.model_ids])[block.brand, block.model]
+    name_code = np.array([[MODEL_NAME_CODE[m] for m in names] for names in block.grid.model_names])[block.brand, block.model]
+    no_window = ~window
+    return {
+        # int32 codes above 32767 retailers (about 2.29M series), as columnar.py does.
+        "retailer": per_series(block.retailer, code_dtype(len(block.grid.retailers))),
+        "brand": per_series(block.brand),
+        "model_id": per_series(model_code),
+        "model_name": per_series(name_code),
+        "condition": condition.ravel(),
+        "week_start": np.broadcast_to(block.grid.week_starts, shape).ravel(),
+        "price": price.ravel(),
+        "promo_price": promo_price.ravel(),
+        "installment_price": installment.ravel(),
+        "promo_start": np.where(no_window, np.datetime64("NaT", "s"), start.astype("datetime64[s]")).ravel(),
+        "promo_end": np.where(no_window, np.datetime64("NaT", "s"), end.astype("datetime64[s]")).ravel(),
+        "promo_type": np.where(no_window, np.int16(-1), promo_type).ravel(),
+        "promo_active": active.ravel(),
+        "prev_week_price": prev.ravel(),
+        "price_change_abs": change_abs.ravel(),
+        "price_change_pct": change_pct.ravel(),
+        "rank_within_brand": rank.reshape(shape).ravel(),
+        "availability_status": availability.ravel(),
+        "currency": np.zeros(price.size, dtype=np.int16),
+        "scraped_at": scraped_at.astype("datetime64[s]").ravel(),
+    }
+
+def write_dataset(out_dir: str, n_retailers: int, n_weeks: int, models: Sequence[str] = tuple(MODELS),
+                  seed: int = generation.RANDOM_SEED, end_week: str = DEFAULT_END_WEEK) -> Dict[str, object]:
+    """Simulates block by block into the columnar.py layout; returns its meta."""
+    grid = make_grid(n_retailers, n_weeks, end_week)
+    rows = grid.n_series * grid.n_weeks
+    base = base_prices(grid, seed)
+    market = market_shocks(seed, n_weeks)
+    categories = {
+        "retailer": grid.retailers,
+        "brand": grid.brands,
+        "model_id": MODEL_IDS_SORTED,
+        "model_name": MODEL_NAMES_SORTED,
+        "condition": COND_SORTED,
+        "promo_type": PROMO_TYPES_SORTED,
+        "availability_status": AVAIL_SORTED,
+        "currency": [generation.CURRENCY],
+    }
+
+    os.makedirs(out_dir, exist_ok=True)
+    meta_path = os.path.join(out_dir, META_FILE)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    files: Dict[str, np.ndarray] = {}
+    offset = 0
+    for i in range(n_blocks(grid)):
+        block = make_block(grid, i, market)
+        columns = block_columns(block, block_prices(block, base, models, seed), seed)
+        for name in generation.COLUMNS:
+            values = columns[name]
+            if name not in files:
+                files[name] = np.lib.format.open_memmap(
+                    os.path.join(out_dir, f"{name}.npy"), mode="w+", dtype=values.dtype, shape=(rows,)
+                )
+            files[name][offset:offset + len(values)] = values
+        offset += block.n * grid.n_weeks
+    dtypes = {name: arr.dtype.str for name, arr in files.items()}
+    for arr in files.values():
+        arr.flush()
+    del files
+
+    meta: Dict[str, object] = {"format": FORMAT, "rows": rows, "sorted_by": SORT_KEY, "columns": []}
+    for name in generation.COLUMNS:
+        entry: Dict[str, object] = {"name": name, "kind": COLUMN_KINDS[name], "dtype": dtypes[name]}
+        if name in categories:
+            entry["categories"] = list(categories[name])
+        meta["columns"].append(entry)
+    # meta.json is written last: a directory without it is an incomplete dataset.
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return meta
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Vectorized (series × weeks) price simulation into the binary column layout.")
+    parser.add_argument("--weeks", type=int, default=DEFAULT_WEEKS, help=f"Weeks per series (default {DEFAULT_WEEKS}).")
+    parser.add_argument("--retailers", type=int, default=len(generation.RETAILERS),
+                        help=f"Retailers (default {len(generation.RETAILERS)}); each adds {len(generation.BRANDS) * MODELS_PER_BRAND} series.")
+    parser.add_argument("--models", type=str, default=",".join(MODELS),
+                        help=f"Comma-separated price models, from {', '.join(MODELS)} (default all).")
+    parser.add_argument("--seed", type=int, default=generation.RANDOM_SEED, help=f"Random seed (default {generation.RANDOM_SEED}).")
+    parser.add_argument("--end-week", type=str, default=DEFAULT_END_WEEK,
+                        help=f"week_start of the last week, YYYY-MM-DD (default {DEFAULT_END_WEEK}).")
+    parser.add_argument("--out", type=str, default=DEFAULT_OUT, help=f"Output directory (default {DEFAULT_OUT}).")
+    args = parser.parse_args(argv)
+
+    models = [m.strip() for m in args.models.split(",") if m.strip()]
+    unknown = [m for m in models if m not in MODELS]
+    if unknown:
+        parser.error(f"unknown models {unknown}; choose from {list(MODELS)}")
+    if args.weeks < 1 or args.retailers < 1:
+        parser.error("--weeks and --retailers must be at least 1")
+    try:
+        np.datetime64(args.end_week, "D")
+    except ValueError:
+        parser.error(f"--end-week must be a YYYY-MM-DD date, got {args.end_week!r}")
+
+    t0 = time.perf_counter()
+    meta = write_dataset(args.out, args.retailers, args.weeks, models, args.seed, args.end_week)
+    elapsed = time.perf_counter() - t0
+
+    grid = make_grid(args.retailers, args.weeks, args.end_week)
+    print("Simulation Summary:")
+    print(f"   Series: {grid.n_series} ({args.retailers} retailers × {len(grid.brands)} brands × {MODELS_PER_BRAND} models)")
+    print(f"   Weeks: {args.weeks} (from {grid.week_starts[0]} to {grid.week_starts[-1]})")
+    print(f"   Models: {models} (seed {args.seed})")
+    print(f"   Rows generated: {meta['rows']} in {elapsed:.2f}s")
+    print(f"   - {args.out}/ (binary columns)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+Asyncio pipeline mode for boulanger_scrapping.py.
+
+discover → fetch → parse → write run as separate stages connected by bounded
+asyncio.Queue objects, so a slow stage applies backpressure to the previous one:
+    - discover: reads category pages and streams product links.
+    - fetch: N concurrent downloads (requests in a thread pool).
+    - parse: BeautifulSoup + JSON-LD + extract_fields in a process pool,
+      so the CPU-bound work does not block the event loop.
+    - write: appends rows to the CSV as they arrive, in discovery order. Pages that finish early
+      wait in a reorder buffer; discovery stops handing out links while more than queue_size
+      pages are unresolved (window semaphore), so that buffer stays bounded too. With dedup=True,
+      rows that duplicate an already written listing are dropped (dedup.Deduplicator)
+      and only their URL is kept, in <out>_provenance.csv.
+"""
+
+import asyncio
+import csv
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+
+from boulanger_scrapping import (
+    COLUMNS,
+    LIMIT,
+    OUTCSV,
+    base_of,
+    fetch_html,
+    first_product_links,
+    get_soup,
+    parse_product_page,
+    provenance_path,
+)
+
+if TYPE_CHECKING:
+    import requests
+
+STOP = object()
+
+_local = threading.local()
+
+def _session() -> "requests.Session":
+    # One keep-alive session per fetch thread.
+    if not hasattr(_local, "session"):
+        import requests
+        _local.session = requests.Session()
+    return _local.session
+
+def _fetch(url: str) -> str:
+    html, _ = fetch_html(url, session=_session())
+    return html
+
+async def discover_stage(category_urls: Iterable[str], limit: int, url_q: asyncio.Queue, io_pool: ThreadPoolExecutor,
+                         window: asyncio.Semaphore) -> int:
+    loop = asyncio.get_running_loop()
+    seen, idx = set(), 0
+    for category_url in category_urls:
+        if idx >= limit:
+            break
+        # A category page that fails to load raises, as in sequential mode.
+        soup, resolved = await loop.run_in_executor(io_pool, get_soup, category_url)
+        for link in first_product_links(soup, base_of(resolved), limit=limit):
+            if link in seen:
+                continue
+            seen.add(link)
+            # Released by write_stage once this page is written or skipped.
+            await window.acquire()
+            await url_q.put((idx, link))
+            idx += 1
+            if idx >= limit:
+                break
+    return idx
+
+async def fetch_stage(url_q: asyncio.Queue, html_q: asyncio.Queue, io_pool: ThreadPoolExecutor) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        item = await url_q.get()
+        if item is STOP:
+            return
+        idx, url = item
+        try:
+            html = await loop.run_in_executor(io_pool, _fetch, url)
+        except Exception:
+            html = None
+        await html_q.put((idx, url, html))
+
+async def parse_stage(html_q: asyncio.Queue, row_q: asyncio.Queue, cpu_pool: ProcessPoolExecutor) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        item = await html_q.get()
+        if item is STOP:
+            return
+        idx, url, html = item
+        row = None
+        if html is not None:
+            try:
+                row = await loop.run_in_executor(cpu_pool, parse_product_page, html)
+            except Exception:
+                row = None
+        await row_q.put((idx, url, row))
+
+async def write_stage(row_q: asyncio.Queue, out_csv: str, window: asyncio.Semaphore, dedup: bool = False) -> int:
+    # Pages finish out of order; rows are buffered until every earlier page has
+    # been written or skipped, so Rank follows discovery order as in sequential mode.
+    pending: Dict[int, Tuple[str, Optional[Dict[str, Any]]]] = {}
+    next_idx, rank = 0, 0
+    deduper = None
+    if dedup:
+        from dedup import Deduplicator
+        deduper = Deduplicator()
+    with open(out_csv, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator=os.linesep)
+        writer.writerow(["Rank"] + COLUMNS)
+        while True:
+            item = await row_q.get()
+            if item is STOP:
+                break
+            idx, url, row = item
+            pending[idx] = (url, row)
+            while next_idx in pending:
+                url, row = pending.pop(next_idx)
+                next_idx += 1
+                window.release()
+                if row is None:
+                    continue
+                if deduper is not None and deduper.add(row, url) is not None:
+                    continue
+                rank += 1
+                writer.writerow([rank] + [row.get(c, "") for c in COLUMNS])
+    if deduper is not None:
+        from dedup import write_provenance
+        write_provenance(deduper.provenance, provenance_path(out_csv))
+    return rank
+
+async def pipeline(
+    category_urls: List[str],
+    limit: int = LIMIT,
+    out_csv: str = OUTCSV,
+    fetch_workers: int = 8,
+    parse_workers: Optional[int] = None,
+    queue_size: int = 64,
+    dedup: bool = False,
+) -> Tuple[int, int]:
+    url_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    html_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    row_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    parse_workers = parse_workers or os.cpu_count() or 1
+    # At most queue_size pages between discovery and the writer, including the reorder buffer.
+    window = asyncio.Semaphore(queue_size)
+
+    with ThreadPoolExecutor(max_workers=fetch_workers + 1) as io_pool, \
+            ProcessPoolExecutor(max_workers=parse_workers) as cpu_pool:
+        writer = asyncio.create_task(write_stage(row_q, out_csv, window, dedup))
+        fetchers = [asyncio.create_task(fetch_stage(url_q, html_q, io_pool)) for _ in range(fetch_workers)]
+        parsers = [asyncio.create_task(parse_stage(html_q, row_q, cpu_pool)) for _ in range(parse_workers)]
+
+        try:
+            discovered = await discover_stage(category_urls, limit, url_q, io_pool, window)
+            for _ in fetchers:
+                await url_q.put(STOP)
+            await asyncio.gather(*fetchers)
+            for _ in parsers:
+                await html_q.put(STOP)
+            await asyncio.gather(*parsers)
+            await row_q.put(STOP)
+            written = await writer
+        except BaseException:
+            for task in [writer, *fetchers, *parsers]:
+                task.cancel()
+            raise
+    return discovered, written
+
+def run_pipeline(category_urls: List[str], **kwargs: Any) -> None:
+    out_csv = kwargs.get("out_csv", OUTCSV)
+    discovered, written = asyncio.run(pipeline(category_urls, **kwargs))
+    if not discovered:
+        print("No product links found.")
+        return
+    print(f"CSV guardado en {out_csv} con {written} filas.")
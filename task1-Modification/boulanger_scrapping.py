@@ -1,22 +1,33 @@
+import argparse
+import csv
 import json
+import os
 import re
 import unicodedata
 from html import unescape
 from urllib.parse import urljoin
 
-import requests
-import pandas as pd
-from bs4 import BeautifulSoup
-
 CATEGORY_URL = "https://www.boulanger.com/c/tous-les-ordinateurs-portables"
 HEADERS = {"User-Agent": "Mozilla/5.0"}
 LIMIT = 100
 OUTCSV = "boulanger_scrapping.csv"
+COLUMNS = ["Brand","CPU Brand","Processor Type","RAM","Storage","Screen Size","Resolution","Price","Product Name"]
 
-def get_soup(url):
-    r = requests.get(url, headers=HEADERS, timeout=15)
+def fetch_html(url, session=None):
+    if session is None:
+        import requests
+        session = requests
+    r = session.get(url, headers=HEADERS, timeout=15)
     r.raise_for_status()
-    return BeautifulSoup(r.text, "html.parser"), r.url
+    return r.text, r.url
+
+def make_soup(html):
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, "html.parser")
+
+def get_soup(url):
+    html, resolved = fetch_html(url)
+    return make_soup(html), resolved
 
 def first_product_links(soup, base_url, limit=3):
     seen, out = set(), []
@@ -297,33 +308,82 @@ def extract_fields(prod):
         "Product Name": name,
     }
 
-
-def main():
-    cat_soup, resolved = get_soup(CATEGORY_URL)
-    base = f"{resolved.split('/',3)[0]}//{resolved.split('/',3)[2]}"
-    links = first_product_links(cat_soup, base, limit=LIMIT)
+def parse_product_page(html):
+    blocks = product_jsonld(make_soup(html))
+    if not blocks:
+        return None
+    return extract_fields(blocks[0])
+
+def write_csv(rows, out_csv):
+    with open(out_csv, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator=os.linesep)
+        writer.writerow(["Rank"] + COLUMNS)
+        for rank, row in enumerate(rows, start=1):
+            writer.writerow([rank] + [row.get(c, "") for c in COLUMNS])
+
+def provenance_path(out_csv):
+    return f"{os.path.splitext(out_csv)[0]}_provenance.csv"
+
+def base_of(url):
+    return f"{url.split('/',3)[0]}//{url.split('/',3)[2]}"
+
+def run_sequential(category_urls=(CATEGORY_URL,), limit=LIMIT, out_csv=OUTCSV, dedup=False):
+    seen, links = set(), []
+    for category_url in category_urls:
+        cat_soup, resolved = get_soup(category_url)
+        for link in first_product_links(cat_soup, base_of(resolved), limit=limit):
+            if link not in seen and len(links) < limit:
+                seen.add(link)
+                links.append(link)
     if not links:
         print("No product links found.")
         return
 
-    rows = []
+    rows, urls = [], []
     for purl in links:
         try:
-            psoup, _ = get_soup(purl)
-            blocks = product_jsonld(psoup)
-            if not blocks:
+            html, _ = fetch_html(purl)
+            row = parse_product_page(html)
+            if row is None:
                 continue
-            prod = blocks[0]
-            rows.append(extract_fields(prod))
+            rows.append(row)
+            urls.append(purl)
         except Exception:
             continue
 
-    df = pd.DataFrame(rows, columns=[
-        "Brand","CPU Brand","Processor Type","RAM","Storage","Screen Size","Resolution","Price","Product Name"
-    ])
-    df.insert(0, "Rank", range(1, len(df) + 1))
-    df.to_csv(OUTCSV, index=False, encoding="utf-8")
-    print(f"CSV guardado en {OUTCSV} con {len(df)} filas.")
+    if dedup:
+        from dedup import dedup_rows, write_provenance
+        result = dedup_rows(rows, urls)
+        print(f"Dedup: {len(rows)} filas → {len(result.rows)} ({len(rows) - len(result.rows)} variantes fusionadas).")
+        rows = result.rows
+        write_provenance(result.provenance, provenance_path(out_csv))
+
+    write_csv(rows, out_csv)
+    print(f"CSV guardado en {out_csv} con {len(rows)} filas.")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scraper de portátiles de Boulanger.")
+    parser.add_argument("--pipeline", choices=["sequential", "async"], default="sequential",
+                        help="sequential (default) or async: discover/fetch/parse/write as concurrent stages.")
+    parser.add_argument("--category", action="append", default=None,
+                        help="Category URL (repeatable; default the laptops category).")
+    parser.add_argument("--limit", type=int, default=LIMIT, help=f"Max product pages (default {LIMIT}).")
+    parser.add_argument("--out", type=str, default=OUTCSV, help=f"Output CSV (default {OUTCSV}).")
+    parser.add_argument("--dedup", action="store_true",
+                        help="Collapse duplicate/variant listings (exact + MinHash/LSH) and write <out>_provenance.csv.")
+    parser.add_argument("--fetch-workers", type=int, default=8, help="Concurrent fetches (async only).")
+    parser.add_argument("--parse-workers", type=int, default=None, help="Parser processes (async only; default CPU count).")
+    parser.add_argument("--queue-size", type=int, default=64, help="Bound of each inter-stage queue (async only).")
+    args = parser.parse_args(argv)
+
+    categories = args.category or [CATEGORY_URL]
+    if args.pipeline == "sequential":
+        run_sequential(categories, args.limit, args.out, dedup=args.dedup)
+        return
+
+    from boulanger_pipeline import run_pipeline
+    run_pipeline(categories, limit=args.limit, out_csv=args.out, dedup=args.dedup, fetch_workers=args.fetch_workers,
+                 parse_workers=args.parse_workers, queue_size=args.queue_size)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,176 @@
+"""
+Dedup stage for boulanger_scrapping.py: collapses listings of the same laptop.
+
+The same laptop often appears under several /ref/ URLs, or as colour/bundle variants.
+Each row is fingerprinted from its specs (Brand, Processor Type, RAM, Storage, Screen
+Size, Resolution) and its product name:
+    - exact: same specs and same normalized name (without colour/bundle words) → same hash.
+    - near: MinHash over character shingles of the name, indexed with LSH (bands of rows),
+      so candidates are found in O(1) per row. A candidate is merged only if the estimated
+      Jaccard similarity reaches NEAR_THRESHOLD, no spec field disagrees, and the model codes
+      (e.g. "15-fc0132nf") and capacities (e.g. "16Go 512Go") in the name are the same. A blank
+      spec field matches anything, so the capacities in the name keep a listing with an empty
+      Storage from absorbing a different SKU.
+
+Rows are processed in discovery order; the first row of a group is kept and later ones are
+folded into it, keeping the list of merged URLs (provenance). Work per row is bounded, so the
+whole pass is near-linear in the number of listings.
+
+Run command:
+    - python boulanger_scrapping.py --dedup   (writes boulanger_scrapping_provenance.csv too)
+"""
+
+import hashlib
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from boulanger_scrapping import norm_key
+
+SPEC_FIELDS = ["Brand", "Processor Type", "RAM", "Storage", "Screen Size", "Resolution"]
+
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_SIZE = 4
+NEAR_THRESHOLD = 0.7
+# Candidates checked per LSH bucket; keeps the cost per row bounded on huge buckets.
+MAX_BUCKET = 32
+
+VARIANT_WORDS = {
+    "noir", "blanc", "gris", "argent", "bleu", "rose", "vert", "rouge", "violet", "jaune", "or", "dore",
+    "minuit", "lumiere", "stellaire", "sideral", "graphite", "platine", "sable", "nuit", "ocean",
+    "black", "white", "silver", "grey", "gray", "blue", "green", "gold", "pink", "midnight", "starlight",
+    "pack", "bundle", "souris", "housse", "sacoche", "avec", "offert", "offerte",
+    # Category words that vary between listings of the same product.
+    "ordinateur", "portable", "pc", "laptop", "notebook",
+}
+HAS_DIGIT = re.compile(r"\d")
+HAS_LETTER = re.compile(r"[a-z]")
+UNIT_TOKEN = re.compile(r"^\d+(?:go|to|gb|tb|mo|mb|ghz|mhz|hz|cm|mm|po|w|wh|cpu|gpu)$")
+# Memory/storage sizes in a norm_key() name, written "512go" or "512 go".
+CAPACITY = re.compile(r"\b(\d+) ?(go|to|gb|tb)\b")
+CAPACITY_UNITS = {"gb": "go", "tb": "to"}
+
+_rng = np.random.default_rng(0x5EED)
+# Multiply-shift hashing: h(x) = ((a * x + b) mod 2^64) >> 32, with a odd.
+_A = (_rng.integers(1, 2**63, size=NUM_PERM, dtype=np.uint64) << np.uint64(1)) | np.uint64(1)
+_B = _rng.integers(0, 2**63, size=NUM_PERM, dtype=np.uint64)
+
+class Match(NamedTuple):
+    url: str
+    kind: str  # canonical | exact | near
+
+class DedupResult(NamedTuple):
+    rows: List[Dict[str, Any]]
+    provenance: List[List[Match]]
+
+def name_tokens(name: str) -> List[str]:
+    return [t for t in norm_key(name).split() if t not in VARIANT_WORDS]
+
+def model_codes(tokens: List[str]) -> frozenset:
+    # Tokens mixing letters and digits identify the model (e.g. "15", "fc0132nf", "14ill10"), except units ("16go").
+    return frozenset(t for t in tokens if HAS_DIGIT.search(t) and HAS_LETTER.search(t) and not UNIT_TOKEN.match(t))
+
+def capacities(name: str) -> frozenset:
+    return frozenset(f"{n}{CAPACITY_UNITS.get(u, u)}" for n, u in CAPACITY.findall(name))
+
+def spec_values(row: Dict[str, Any]) -> Tuple[str, ...]:
+    # extract_fields() already normalizes these; only case and spacing are folded here.
+    return tuple(" ".join(str(row.get(f) or "").lower().split()) for f in SPEC_FIELDS)
+
+def specs_compatible(a: Tuple[str, ...], b: Tuple[str, ...]) -> bool:
+    return all(x == y or not x or not y for x, y in zip(a, b))
+
+def minhash(text: str) -> np.ndarray:
+    # norm_key() output is ASCII, so each 4-character shingle packs exactly into a uint32.
+    b = np.frombuffer(text.encode().ljust(SHINGLE_SIZE), dtype=np.uint8).astype(np.uint64)
+    n = len(b) - SHINGLE_SIZE + 1
+    x = (b[:n] << np.uint64(24)) | (b[1:n + 1] << np.uint64(16)) | (b[2:n + 2] << np.uint64(8)) | b[3:n + 3]
+    return ((np.multiply.outer(x, _A) + _B) >> np.uint64(32)).min(axis=0).astype(np.uint32)
+
+class Deduplicator:
+    """Incremental deduplicator: add() rows in discovery order."""
+
+    def __init__(self, threshold: float = NEAR_THRESHOLD):
+        self.threshold = threshold
+        self.rows: List[Dict[str, Any]] = []
+        self.provenance: List[List[Match]] = []
+        self._specs: List[Tuple[str, ...]] = []
+        self._codes: List[frozenset] = []
+        self._capacities: List[frozenset] = []
+        self._signatures = np.empty((1024, NUM_PERM), dtype=np.uint32)
+        self._exact: Dict[bytes, int] = {}
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(BANDS)]
+
+    def add(self, row: Dict[str, Any], url: str = "") -> Optional[int]:
+        """Returns the index of the kept row this one was merged into, or None if it is new."""
+        tokens = name_tokens(row.get("Product Name") or "")
+        specs = spec_values(row)
+        name = " ".join(tokens)
+
+        exact_key = hashlib.blake2b("\x1f".join(specs + (name,)).encode(), digest_size=16).digest()
+        hit = self._exact.get(exact_key)
+        if hit is not None:
+            self.provenance[hit].append(Match(url, "exact"))
+            return hit
+
+        codes = model_codes(tokens)
+        sizes = capacities(name)
+        sig = minhash(name)
+        raw, width = sig.tobytes(), ROWS_PER_BAND * sig.itemsize
+        band_keys = [raw[b * width:(b + 1) * width] for b in range(BANDS)]
+
+        best = None
+        cands = set()
+        for b, key in enumerate(band_keys):
+            cands.update(self._buckets[b].get(key, ())[:MAX_BUCKET])
+        if cands:
+            cand = np.fromiter(cands, dtype=np.intp, count=len(cands))
+            sims = np.count_nonzero(self._signatures[cand] == sig, axis=1) / NUM_PERM
+            keep = sims >= self.threshold
+            cand, sims = cand[keep], sims[keep]
+            # Most similar first; ties go to the earliest listing.
+            for c in cand[np.lexsort((cand, -sims))].tolist():
+                if self._codes[c] == codes and self._capacities[c] == sizes and specs_compatible(self._specs[c], specs):
+                    best = c
+                    break
+        if best is not None:
+            self._exact[exact_key] = best
+            self.provenance[best].append(Match(url, "near"))
+            return best
+
+        idx = len(self.rows)
+        self.rows.append(row)
+        self.provenance.append([Match(url, "canonical")])
+        self._specs.append(specs)
+        self._codes.append(codes)
+        self._capacities.append(sizes)
+        if idx == len(self._signatures):
+            self._signatures = np.concatenate([self._signatures, np.empty_like(self._signatures)])
+        self._signatures[idx] = sig
+        self._exact[exact_key] = idx
+        for b, key in enumerate(band_keys):
+            self._buckets[b].setdefault(key, []).append(idx)
+        return None
+
+    def result(self) -> DedupResult:
+        return DedupResult(self.rows, self.provenance)
+
+def dedup_rows(rows: List[Dict[str, Any]], urls: Optional[List[str]] = None, threshold: float = NEAR_THRESHOLD) -> DedupResult:
+    d = Deduplicator(threshold)
+    for i, row in enumerate(rows):
+        d.add(row, urls[i] if urls else "")
+    return d.result()
+
+def write_provenance(provenance: List[List[Match]], path: str) -> None:
+    import csv
+    import os
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator=os.linesep)
+        writer.writerow(["Rank", "URL", "Match"])
+        for rank, matches in enumerate(provenance, start=1):
+            for m in matches:
+                writer.writerow([rank, m.url, m.kind])
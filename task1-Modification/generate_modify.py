@@ -1,14 +1,17 @@
 import argparse
+import csv
+import os
 import random
 import string
 from datetime import datetime, timezone
-from typing import List, Dict, Any, Tuple
-
-import numpy as np
-import pandas as pd
+from typing import List, Dict, Any, Tuple, Callable, Optional
 
 RANDOM_SEED = random.randint(1, 9999)
 DEFAULT_N = 100
+# Hasta este número de filas se usa el camino en Python puro (sin importar numpy/pandas).
+SMALL_JOB_ROWS = 50_000
+
+COLUMNS = ["Rank", "Brand", "CPU Brand", "Processor Type", "RAM", "Storage", "Screen Size", "Resolution", "Price", "Product Name"]
 
 BRANDS = ["HP", "Lenovo", "Dell", "Apple", "ASUS", "Samsung", "Acer"]
 
@@ -97,9 +100,9 @@ def cpu_for_brand(brand: str) -> Tuple[str, str]:
             proc = random.choice(CPU_AMD)
             return ("AMD", proc)
 
-def synth_price(brand: str) -> float:
+def synth_price(brand: str, beta: Callable[[float, float], float]) -> float:
     lo, hi = PRICE_RANGES[brand]
-    x = np.random.beta(2, 3)
+    x = beta(2, 3)
     price = lo + x * (hi - lo)
     return round(float(price), 2)
 
@@ -108,7 +111,14 @@ def make_product_name(brand: str, model: str, screen: str, res: str, ram: str, s
     details = f"{screen} {res} | {ram} | {storage} | {cpu}"
     return f"{base} | {details}"
 
-def generate_rows(n: int, retailer: str) -> List[Dict[str, Any]]:
+def generate_rows(n: int, retailer: str, beta: Optional[Callable[[float, float], float]] = None) -> List[Dict[str, Any]]:
+    """
+    beta: generador Beta(a, b); por defecto np.random.beta (random.betavariate en el camino Python puro).
+    """
+    if beta is None:
+        import numpy as np
+        beta = np.random.beta
+
     rows: List[Dict[str, Any]] = []
     per_brand = max(1, n // len(BRANDS))
     leftover = n - per_brand * len(BRANDS)
@@ -128,7 +138,7 @@ def generate_rows(n: int, retailer: str) -> List[Dict[str, Any]]:
         storage = random.choice(STORAGE_OPTIONS)
         screen = random.choice(SCREEN_SIZES)
         res = random.choice(RESOLUTIONS)
-        price = synth_price(brand)
+        price = synth_price(brand, beta)
 
         product_name = make_product_name(
             brand=brand,
@@ -155,34 +165,66 @@ def generate_rows(n: int, retailer: str) -> List[Dict[str, Any]]:
 
     return rows
 
-def main():
-    parser = argparse.ArgumentParser(description="Genera Traditional_Segment para un retailer.")
-    parser.add_argument("--retailer", type=str, help="Nombre del retailer (ej: Fnac o Boulanger).")
-    parser.add_argument("--n", type=int, default=DEFAULT_N, help="Número de filas a generar (default 100).")
-    parser.add_argument("--out", type=str, default=None, help="Nombre de archivo de salida (CSV).")
-    args = parser.parse_args()
+def write_rows_python(rows: List[Dict[str, Any]], out_csv: str) -> None:
+    rows.sort(key=lambda r: (r["Price"], r["Brand"], r["Product Name"]))
+    for i, r in enumerate(rows, start=1):
+        r["Rank"] = i
 
-    retailer = args.retailer
-    if not retailer:
-        retailer = input("Introduce el retailer (ej: Fnac, Boulanger): ").strip() or "Retailer"
+    with open(out_csv, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator=os.linesep)
+        writer.writerow(COLUMNS)
+        for r in rows:
+            writer.writerow([r[c] for c in COLUMNS])
 
-    random.seed(RANDOM_SEED)
-    np.random.seed(RANDOM_SEED)
+    print(f"✅ Archivo generado: {out_csv}")
+    print(f"   Filas: {len(rows)} | Columnas: {len(COLUMNS)}")
+    head = [[str(r[c]) for c in COLUMNS] for r in rows[:5]]
+    widths = [max([len(c)] + [len(h[i]) for h in head]) for i, c in enumerate(COLUMNS)]
+    for line in [COLUMNS] + head:
+        print(" ".join(v.rjust(w) for v, w in zip(line, widths)))
+
+def write_rows_pandas(rows: List[Dict[str, Any]], out_csv: str) -> None:
+    import pandas as pd
 
-    rows = generate_rows(args.n, retailer)
     df = pd.DataFrame(rows)
 
     df = df.sort_values(by=["Price", "Brand", "Product Name"], ascending=[True, True, True]).reset_index(drop=True)
     df.insert(0, "Rank", df.index + 1)
 
-    cols = ["Rank", "Brand", "CPU Brand", "Processor Type", "RAM", "Storage", "Screen Size", "Resolution", "Price", "Product Name"]
-    df = df[cols]
+    df = df[COLUMNS]
 
-    out_csv = args.out or f"synthesize_data_{retailer}.csv"
     df.to_csv(out_csv, index=False)
     print(f"✅ Archivo generado: {out_csv}")
     print(f"   Filas: {len(df)} | Columnas: {len(df.columns)}")
     print(df.head(5).to_string(index=False))
 
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Genera Traditional_Segment para un retailer.")
+    parser.add_argument("--retailer", type=str, help="Nombre del retailer (ej: Fnac o Boulanger).")
+    parser.add_argument("--n", type=int, default=DEFAULT_N, help="Número de filas a generar (default 100).")
+    parser.add_argument("--out", type=str, default=None, help="Nombre de archivo de salida (CSV).")
+    parser.add_argument("--engine", choices=["auto", "python", "pandas"], default="auto",
+                        help=f"auto: Python puro hasta {SMALL_JOB_ROWS} filas, numpy/pandas por encima (default auto).")
+    args = parser.parse_args(argv)
+
+    retailer = args.retailer
+    if not retailer:
+        retailer = input("Introduce el retailer (ej: Fnac, Boulanger): ").strip() or "Retailer"
+
+    engine = args.engine
+    if engine == "auto":
+        engine = "python" if args.n <= SMALL_JOB_ROWS else "pandas"
+
+    out_csv = args.out or f"synthesize_data_{retailer}.csv"
+    random.seed(RANDOM_SEED)
+    if engine == "python":
+        rows = generate_rows(args.n, retailer, beta=random.betavariate)
+        write_rows_python(rows, out_csv)
+    else:
+        import numpy as np
+        np.random.seed(RANDOM_SEED)
+        rows = generate_rows(args.n, retailer)
+        write_rows_pandas(rows, out_csv)
+
 if __name__ == "__main__":
     main()
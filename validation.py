@@ -1,12 +1,24 @@
 #Autor: Oscar Díaz
 
-import pandas as pd
-import numpy as np
-from datetime import datetime
+import argparse
+import csv
+import os
+from datetime import datetime, timezone
 import sys
+from typing import Any, Dict, List, NamedTuple, Optional, TYPE_CHECKING
+
+from generation import round2
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    from columnar import ColumnarDataset
 
 CSV_PATH = "dataset.csv"
 
+# Files up to this size are validated with the pure-Python engine (no pandas import).
+SMALL_FILE_BYTES = 8_000_000
+
 REQUIRED_COLUMNS = [
     "retailer","brand","model_id","model_name","condition","week_start","price","promo_price",
     "installment_price","promo_start","promo_end","promo_type","promo_active","prev_week_price",
@@ -30,21 +42,23 @@ def is_iso_datetime_z(s: str) -> bool:
     except Exception:
         return False
 
-def main():
-    df = pd.read_csv(CSV_PATH, dtype={"retailer": str, "brand": str, "model_id": str})
+def load_dataset(path: str = CSV_PATH) -> "pd.DataFrame":
+    import pandas as pd
 
-    print(f"Rows: {len(df)}")
-    print(f"Columns: {len(df.columns)}")
+    return pd.read_csv(path, dtype={"retailer": str, "brand": str, "model_id": str})
 
+def check_required_columns(df: "pd.DataFrame") -> None:
     missing_cols = [c for c in REQUIRED_COLUMNS if c not in df.columns]
     assert not missing_cols, f"Missing required columns: {missing_cols}"
 
+def check_enums(df: "pd.DataFrame") -> None:
     assert set(df["retailer"].unique()).issubset({"Fnac","Boulanger"}), "Retailer out of {Fnac,Boulanger}"
     assert set(df["brand"].unique()).issubset({"HP","Lenovo","Dell","Apple","ASUS","Samsung","Acer"}), "Brand out of list"
     assert set(df["availability_status"].dropna().unique()).issubset({"in_stock","out_of_stock","preorder"}), "availability_status invalid"
     assert set(df["condition"].dropna().unique()).issubset({"new","refurb","used"}), "condition invalid"
     assert set(df["currency"].dropna().unique()) == {"EUR"}, "currency debe ser siempre EUR"
 
+def check_iso_dates(df: "pd.DataFrame") -> None:
     bad_week_start_fmt = df[~df["week_start"].astype(str).apply(is_iso_date)]
     assert bad_week_start_fmt.empty, f"week_start no ISO date in {len(bad_week_start_fmt)} rows"
 
@@ -53,11 +67,15 @@ def main():
         bad = df.loc[mask & ~df[col].astype(str).apply(is_iso_datetime_z)]
         assert bad.empty, f"{col} no ISO datetime in {len(bad)} rows"
 
+def check_non_negative(df: "pd.DataFrame") -> None:
     for col in ["price","promo_price","installment_price","prev_week_price"]:
         mask = df[col].notna()
         bad = df.loc[mask & (df[col] < 0)]
         assert bad.empty, f"{col} have negative values in {len(bad)} rows"
 
+def check_promo_active(df: "pd.DataFrame") -> None:
+    import pandas as pd
+
     active = df[df["promo_active"] == True].copy()
     if not active.empty:
         no_pp = active[active["promo_price"].isna()]
@@ -70,6 +88,9 @@ def main():
         outside = active[(ps.isna()) | (pe.isna()) | (ws < ps) | (ws > pe)]
         assert outside.empty, f"promo_active=True but week_start is not in [promo_start,promo_end] in {len(outside)} rows"
 
+def check_weekly_changes(df: "pd.DataFrame") -> None:
+    import numpy as np
+
     df_sorted = df.sort_values(by=["retailer","brand","model_id","week_start"])
     grp = df_sorted.groupby(["retailer","brand","model_id"])
 
@@ -83,6 +104,7 @@ def main():
     mask_pct = ~(df_sorted["prev_week_price"].isna() | (df_sorted["prev_week_price"] == 0))
     assert np.allclose(df_sorted.loc[mask_pct, "price_change_pct"], dif_pct[mask_pct]), "price_change_pct incorrect"
 
+def check_rank_within_brand(df: "pd.DataFrame") -> None:
     rb = df.groupby(["retailer","brand","week_start"])["rank_within_brand"]
     out_of_range = df[(df["rank_within_brand"] < 1) | (df["rank_within_brand"] > 10)]
     assert out_of_range.empty, f"rank_within_brand out of 1..10 in {len(out_of_range)} rows"
@@ -90,13 +112,333 @@ def main():
     dups = rb.apply(lambda s: s.duplicated().sum()).sum()
     assert dups == 0, f"rank_within_brand duplicated within some (retailer,brand,week_start): {dups} duplicates"
 
+def check_min_rows(df: "pd.DataFrame") -> None:
     assert len(df) >= 560, f"Expected at least 560 rows; found {len(df)}"
 
+# Rules run in this order; benchmark.py times each one separately.
+RULES = [
+    ("required_columns", check_required_columns),
+    ("enums", check_enums),
+    ("iso_dates", check_iso_dates),
+    ("non_negative", check_non_negative),
+    ("promo_active", check_promo_active),
+    ("weekly_changes", check_weekly_changes),
+    ("rank_within_brand", check_rank_within_brand),
+    ("min_rows", check_min_rows),
+]
+
+NUMERIC_COLUMNS = [
+    "price","promo_price","installment_price","prev_week_price",
+    "price_change_abs","price_change_pct","rank_within_brand"
+]
+
+class Table(NamedTuple):
+    columns: List[str]
+    rows: List[Dict[str, Any]]
+
+def load_table(path: str = CSV_PATH) -> Table:
+    # Pure-Python counterpart of load_dataset: empty cells → None, numeric columns → float.
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        columns = list(reader.fieldnames or [])
+        numeric = [c for c in NUMERIC_COLUMNS if c in columns]
+        rows = []
+        for r in reader:
+            for c, v in r.items():
+                if v == "":
+                    r[c] = None
+            for c in numeric:
+                if r[c] is not None:
+                    r[c] = float(r[c])
+            rows.append(r)
+    return Table(columns, rows)
+
+def _isclose(a: Optional[float], b: Optional[float]) -> bool:
+    # np.allclose defaults (rtol=1e-05, atol=1e-08); None behaves like NaN.
+    if a is None or b is None:
+        return False
+    return abs(a - b) <= 1e-08 + 1e-05 * abs(b)
+
+def _to_utc(s: Optional[str]) -> Optional[datetime]:
+    if s is None:
+        return None
+    try:
+        d = datetime.fromisoformat(s.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return d.replace(tzinfo=timezone.utc) if d.tzinfo is None else d
+
+def py_check_required_columns(t: Table) -> None:
+    missing_cols = [c for c in REQUIRED_COLUMNS if c not in t.columns]
+    assert not missing_cols, f"Missing required columns: {missing_cols}"
+
+def py_check_enums(t: Table) -> None:
+    def values(col: str, dropna: bool = False) -> set:
+        return {r[col] for r in t.rows if not (dropna and r[col] is None)}
+
+    assert values("retailer").issubset({"Fnac","Boulanger"}), "Retailer out of {Fnac,Boulanger}"
+    assert values("brand").issubset({"HP","Lenovo","Dell","Apple","ASUS","Samsung","Acer"}), "Brand out of list"
+    assert values("availability_status", True).issubset({"in_stock","out_of_stock","preorder"}), "availability_status invalid"
+    assert values("condition", True).issubset({"new","refurb","used"}), "condition invalid"
+    assert values("currency", True) == {"EUR"}, "currency debe ser siempre EUR"
+
+def py_check_iso_dates(t: Table) -> None:
+    bad_week_start_fmt = sum(1 for r in t.rows if not is_iso_date(r["week_start"] or "nan"))
+    assert bad_week_start_fmt == 0, f"week_start no ISO date in {bad_week_start_fmt} rows"
+
+    for col in ["promo_start","promo_end","scraped_at"]:
+        bad = sum(1 for r in t.rows if r[col] is not None and not is_iso_datetime_z(r[col]))
+        assert bad == 0, f"{col} no ISO datetime in {bad} rows"
+
+def py_check_non_negative(t: Table) -> None:
+    for col in ["price","promo_price","installment_price","prev_week_price"]:
+        bad = sum(1 for r in t.rows if r[col] is not None and r[col] < 0)
+        assert bad == 0, f"{col} have negative values in {bad} rows"
+
+def py_check_promo_active(t: Table) -> None:
+    active = [r for r in t.rows if r["promo_active"] in ("True", "TRUE", "true")]
+    no_pp = sum(1 for r in active if r["promo_price"] is None)
+    assert no_pp == 0, f"promo_active=True but promo_price is null in {no_pp} rows"
+
+    outside = 0
+    for r in active:
+        ps, pe = _to_utc(r["promo_start"]), _to_utc(r["promo_end"])
+        ws = datetime.strptime(r["week_start"], "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        if ps is None or pe is None or ws < ps or ws > pe:
+            outside += 1
+    assert outside == 0, f"promo_active=True but week_start is not in [promo_start,promo_end] in {outside} rows"
+
+def py_check_weekly_changes(t: Table) -> None:
+    rows_sorted = sorted(t.rows, key=lambda r: (r["retailer"] or "", r["brand"] or "", r["model_id"] or "", r["week_start"] or ""))
+
+    bad_prev = bad_abs = bad_pct = 0
+    prev_key, prev_price = None, None
+    for r in rows_sorted:
+        key = (r["retailer"], r["brand"], r["model_id"])
+        recomputed_prev = prev_price if key == prev_key else None
+        prev_key, prev_price = key, r["price"]
+
+        stored = r["prev_week_price"]
+        if not _isclose(-999999 if stored is None else stored, -999999 if recomputed_prev is None else recomputed_prev):
+            bad_prev += 1
+        if stored is None:
+            continue
+
+        dif_abs = None
+        if recomputed_prev is not None and r["price"] is not None:
+            dif_abs = round2(r["price"] - recomputed_prev)
+        if not _isclose(r["price_change_abs"], dif_abs):
+            bad_abs += 1
+        if stored != 0:
+            dif_pct = round2(100 * dif_abs / recomputed_prev) if dif_abs is not None and recomputed_prev else None
+            if not _isclose(r["price_change_pct"], dif_pct):
+                bad_pct += 1
+
+    assert bad_prev == 0, "prev_week_price incorrectly calculated"
+    assert bad_abs == 0, "price_change_abs incorrect"
+    assert bad_pct == 0, "price_change_pct incorrect"
+
+def py_check_rank_within_brand(t: Table) -> None:
+    out_of_range = sum(1 for r in t.rows if r["rank_within_brand"] is not None and not 1 <= r["rank_within_brand"] <= 10)
+    assert out_of_range == 0, f"rank_within_brand out of 1..10 in {out_of_range} rows"
+
+    seen = set()
+    dups = 0
+    for r in t.rows:
+        key = (r["retailer"], r["brand"], r["week_start"], r["rank_within_brand"])
+        if key in seen:
+            dups += 1
+        seen.add(key)
+    assert dups == 0, f"rank_within_brand duplicated within some (retailer,brand,week_start): {dups} duplicates"
+
+def py_check_min_rows(t: Table) -> None:
+    assert len(t.rows) >= 560, f"Expected at least 560 rows; found {len(t.rows)}"
+
+PY_RULES = [
+    ("required_columns", py_check_required_columns),
+    ("enums", py_check_enums),
+    ("iso_dates", py_check_iso_dates),
+    ("non_negative", py_check_non_negative),
+    ("promo_active", py_check_promo_active),
+    ("weekly_changes", py_check_weekly_changes),
+    ("rank_within_brand", py_check_rank_within_brand),
+    ("min_rows", py_check_min_rows),
+]
+
+def col_check_required_columns(ds: "ColumnarDataset") -> None:
+    missing_cols = [c for c in REQUIRED_COLUMNS if c not in ds.columns]
+    assert not missing_cols, f"Missing required columns: {missing_cols}"
+
+def col_check_enums(ds: "ColumnarDataset") -> None:
+    def values(col: str, dropna: bool = False) -> set:
+        return {v for v in ds.used_categories(col) if not (dropna and v is None)}
+
+    assert values("retailer").issubset({"Fnac","Boulanger"}), "Retailer out of {Fnac,Boulanger}"
+    assert values("brand").issubset({"HP","Lenovo","Dell","Apple","ASUS","Samsung","Acer"}), "Brand out of list"
+    assert values("availability_status", True).issubset({"in_stock","out_of_stock","preorder"}), "availability_status invalid"
+    assert values("condition", True).issubset({"new","refurb","used"}), "condition invalid"
+    assert values("currency", True) == {"EUR"}, "currency debe ser siempre EUR"
+
+def col_check_iso_dates(ds: "ColumnarDataset") -> None:
+    import numpy as np
+
+    # Non-ISO strings are rejected when the binary layout is written, so only a missing
+    # week_start (which the CSV rules also reject) can remain.
+    bad_week_start_fmt = int(np.count_nonzero(np.isnat(ds["week_start"])))
+    assert bad_week_start_fmt == 0, f"week_start no ISO date in {bad_week_start_fmt} rows"
+
+def col_check_non_negative(ds: "ColumnarDataset") -> None:
+    import numpy as np
+
+    for col in ["price","promo_price","installment_price","prev_week_price"]:
+        bad = int(np.count_nonzero(ds[col] < 0))
+        assert bad == 0, f"{col} have negative values in {bad} rows"
+
+def col_check_promo_active(ds: "ColumnarDataset") -> None:
+    import numpy as np
+
+    active = np.asarray(ds["promo_active"])
+    no_pp = int(np.count_nonzero(active & np.isnan(ds["promo_price"])))
+    assert no_pp == 0, f"promo_active=True but promo_price is null in {no_pp} rows"
+
+    ps, pe, ws = ds["promo_start"], ds["promo_end"], ds["week_start"]
+    outside = active & (np.isnat(ps) | np.isnat(pe) | (ws < ps) | (ws > pe))
+    n_outside = int(np.count_nonzero(outside))
+    assert n_outside == 0, f"promo_active=True but week_start is not in [promo_start,promo_end] in {n_outside} rows"
+
+def _series_order(ds: "ColumnarDataset") -> Optional["np.ndarray"]:
+    import numpy as np
+
+    if ds.sorted_by == ["retailer","brand","model_id","week_start"]:
+        return None
+    return np.lexsort([ds["week_start"], ds["model_id"], ds["brand"], ds["retailer"]])
+
+def col_check_weekly_changes(ds: "ColumnarDataset") -> None:
+    import numpy as np
+
+    # On the stored sort order every column is used as a view; otherwise rows are gathered once.
+    order = _series_order(ds)
+    take = (lambda a: a) if order is None else (lambda a: np.asarray(a)[order])
+    price, prev = take(ds["price"]), take(ds["prev_week_price"])
+    r, b, m = take(ds["retailer"]), take(ds["brand"]), take(ds["model_id"])
+
+    same_series = (r[1:] == r[:-1]) & (b[1:] == b[:-1]) & (m[1:] == m[:-1])
+    recomputed_prev = np.full(len(price), np.nan)
+    recomputed_prev[1:] = np.where(same_series, price[:-1], np.nan)
+    dif_abs = np.round(price - recomputed_prev, 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dif_pct = np.round(100 * dif_abs / recomputed_prev, 2)
+
+    assert np.allclose(np.nan_to_num(prev, nan=-999999), np.nan_to_num(recomputed_prev, nan=-999999)), "prev_week_price incorrectly calculated"
+    mask_abs = ~np.isnan(prev)
+    assert np.allclose(take(ds["price_change_abs"])[mask_abs], dif_abs[mask_abs]), "price_change_abs incorrect"
+    mask_pct = ~(np.isnan(prev) | (prev == 0))
+    assert np.allclose(take(ds["price_change_pct"])[mask_pct], dif_pct[mask_pct]), "price_change_pct incorrect"
+
+def col_check_rank_within_brand(ds: "ColumnarDataset") -> None:
+    import numpy as np
+
+    rank = ds["rank_within_brand"]
+    out_of_range = int(np.count_nonzero((rank < 1) | (rank > 10)))
+    assert out_of_range == 0, f"rank_within_brand out of 1..10 in {out_of_range} rows"
+
+    # Sorted by (retailer, brand, week_start, rank), each row equal to the previous one is a duplicate.
+    # Compared column by column, so code widths do not matter (no bit packing).
+    keys = [ds["retailer"], ds["brand"], ds["week_start"], rank]
+    order = np.lexsort(keys[::-1])
+    same = np.ones(max(len(rank) - 1, 0), dtype=bool)
+    for k in keys:
+        k = np.asarray(k)[order]
+        same &= k[1:] == k[:-1]
+    dups = int(np.count_nonzero(same))
+    assert dups == 0, f"rank_within_brand duplicated within some (retailer,brand,week_start): {dups} duplicates"
+
+def col_check_min_rows(ds: "ColumnarDataset") -> None:
+    assert len(ds) >= 560, f"Expected at least 560 rows; found {len(ds)}"
+
+COL_RULES = [
+    ("required_columns", col_check_required_columns),
+    ("enums", col_check_enums),
+    ("iso_dates", col_check_iso_dates),
+    ("non_negative", col_check_non_negative),
+    ("promo_active", col_check_promo_active),
+    ("weekly_changes", col_check_weekly_changes),
+    ("rank_within_brand", col_check_rank_within_brand),
+    ("min_rows", col_check_min_rows),
+]
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Validates that the dataset complies with business rules.")
+    parser.add_argument("--csv", type=str, default=CSV_PATH, help=f"Dataset to validate (default {CSV_PATH}).")
+    parser.add_argument("--binary", type=str, default=None,
+                        help="Validate a binary column directory (see columnar.py) through mmap instead of a CSV.")
+    parser.add_argument("--engine", choices=["auto", "python", "pandas"], default="auto",
+                        help=f"auto: pure Python up to {SMALL_FILE_BYTES // 1_000_000} MB, pandas above (default auto).")
+    parser.add_argument("--sample-rate", type=float, default=None,
+                        help="Tiered mode (see sampling.py): cheap rules on every row, expensive rules on this fraction "
+                             "of the series of each (retailer, brand); exhaustive only if the sample flags problems.")
+    parser.add_argument("--confidence", type=float, default=0.95, help="Confidence level of the sampled bounds (default 0.95).")
+    parser.add_argument("--seed", type=int, default=42, help="Seed of the sample (default 42).")
+    args = parser.parse_args(argv)
+
+    if args.sample_rate is not None:
+        if not 0 < args.sample_rate <= 1:
+            parser.error("--sample-rate must be in (0, 1]")
+        if args.binary or args.engine == "python":
+            parser.error("--sample-rate works on CSV input with the pandas engine")
+
+    engine = args.engine
+    if args.sample_rate is not None:
+        engine = "pandas"
+    elif args.binary:
+        engine = "columnar"
+    elif engine == "auto":
+        engine = "python" if os.path.getsize(args.csv) <= SMALL_FILE_BYTES else "pandas"
+
+    data: Any
+    if engine == "columnar":
+        from columnar import open_columnar
+        data = open_columnar(args.binary)
+        rules = COL_RULES
+        n_rows, n_cols = len(data), len(data.columns)
+    elif engine == "python":
+        data = load_table(args.csv)
+        rules = PY_RULES
+        n_rows, n_cols = len(data.rows), len(data.columns)
+    else:
+        data = load_dataset(args.csv)
+        rules = RULES
+        n_rows, n_cols = len(data), len(data.columns)
+
+    print(f"Rows: {n_rows}")
+    print(f"Columns: {n_cols}")
+
+    if args.sample_rate is not None:
+        from sampling import run_sampled
+        run_sampled(data, args.sample_rate, args.confidence, args.seed)
+    else:
+        for _, rule in rules:
+            rule(data)
+
+    if engine == "columnar":
+        import numpy as np
+        retailers = sorted(data.used_categories("retailer"))
+        brands = sorted(data.used_categories("brand"))
+        weeks = [str(d) for d in np.unique(data["week_start"])]
+    elif engine == "python":
+        retailers = sorted({r["retailer"] for r in data.rows})
+        brands = sorted({r["brand"] for r in data.rows})
+        weeks = sorted({r["week_start"] for r in data.rows if r["week_start"] is not None})
+    else:
+        retailers = sorted(data["retailer"].unique())
+        brands = sorted(data["brand"].unique())
+        weeks = sorted(data["week_start"].dropna().unique())
+
     print("Validation completed.")
     print("Summary:")
-    print(f"- Retailers: {sorted(df['retailer'].unique())}")
-    print(f"- Brands: {sorted(df['brand'].unique())}")
-    print(f"- Weeks: {df['week_start'].nunique()} (from {df['week_start'].min()} to {df['week_start'].max()})")
+    print(f"- Retailers: {retailers}")
+    print(f"- Brands: {brands}")
+    print(f"- Weeks: {len(weeks)} (from {weeks[0]} to {weeks[-1]})")
 
 if __name__ == "__main__":
     try: